@@ -12,15 +12,38 @@ bl_info = {
 
 import bpy
 from bpy_extras.io_utils import ImportHelper
-from bpy.props import StringProperty, BoolProperty, EnumProperty, IntProperty, PointerProperty, FloatVectorProperty
-from bpy.types import Operator, PropertyGroup, Object                                                                                                                                                                                                                                                                                   
+from bpy.props import StringProperty, BoolProperty, EnumProperty, IntProperty, FloatProperty, PointerProperty, FloatVectorProperty
+from bpy.types import Operator, PropertyGroup, Object, AddonPreferences                                                                                                                                                                                                                                                                                   
+import argparse
+import ast
+import bz2
 import csv
-import bmesh
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import lzma
+import mmap
+import multiprocessing
+import operator
+import os
+import sys
+import tempfile
+import threading
+import warnings
 import random
-from math import radians, degrees
+import numpy
+from array import array
+from math import radians, degrees, pi, ceil
 from mathutils import Vector, Color
 from collections import Counter
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 def dump(obj):
    for attr in dir(obj):
        if hasattr( obj, attr ):
@@ -37,6 +60,50 @@ class Utils():
         else:
             return True
     
+    # infers the type of each column from a sample of rows. A column is
+    # numeric if all of its non-empty values are numbers.
+    def infer_column_types(self, rows):
+        types = []
+        for j in range(max(len(row) for row in rows)):
+            values = [row[j] for row in rows if j < len(row) and row[j] != '']
+            if (values and all(self.is_number(v) for v in values)):
+                types.append(DataStorage.NUMERIC)
+            else:
+                types.append(DataStorage.STRING)
+        return types
+
+    # Adds values to a uniform random sample of at most size items
+    # (reservoir sampling), where seen is the amount of items offered so far.
+    # Returns the updated sample and count.
+    def reservoir_update(self, reservoir, seen, values, size):
+        free = size - len(reservoir)
+        if (free > 0):
+            reservoir = numpy.concatenate((reservoir, values[:free]))
+            seen += len(values[:free])
+            values = values[free:]
+        if (len(values)):
+            # item t replaces a random slot with probability size / (t + 1)
+            positions = seen + numpy.arange(1, len(values) + 1)
+            slots = (numpy.random.random(len(values)) * positions).astype(numpy.int64)
+            keep = slots < size
+            reservoir[slots[keep]] = values[keep]
+            seen += len(values)
+        return (reservoir, seen)
+
+    # writes one value per vertex of a mesh into a named point attribute.
+    # Falls back to vertex layers on versions without generic attributes.
+    def set_point_attribute(self, mesh, name, values, type='FLOAT'):
+        if (hasattr(mesh, 'attributes')):
+            if (mesh.attributes.get(name) is not None):
+                mesh.attributes.remove(mesh.attributes[name])
+            layer = mesh.attributes.new(name=name, type=type, domain='POINT')
+        elif (type == 'INT'):
+            layer = mesh.vertex_layers_int.new(name=name)
+        else:
+            layer = mesh.vertex_layers_float.new(name=name)
+        dtype = numpy.int32 if type == 'INT' else numpy.float32
+        layer.data.foreach_set('value', numpy.asarray(values, dtype=dtype))
+
     # get approximate dimensions of the visual area which the objects cover
     def measure_bl_array_dimensions(self, objects):
         dimensions = None
@@ -62,41 +129,16 @@ class Utils():
             ob.scale = (ob.scale.x * scale_number, ob.scale.y * scale_number, ob.scale.z * scale_number)
             ob.location = (ob.location.x * scale_number, ob.location.y * scale_number, ob.location.z * scale_number)
 
-    # Based on:
-    # https://gifguide2code.wordpress.com/2017/04/09/python-how-to-code-materials-in-blender-cycles/
+    # returns a shadeless material of the given color, reusing
+    # an existing one from the MaterialPool if possible.
     def create_shadeless_mat(self,color=(0.08,0.09,0.1),id='Visualization'):
-        # initialize node
-        mat_name = id
-        num = 1
-
-        while (mat_name in bpy.data.materials):
-            mat_name = id + '.' + str(num)
-            num += 1
-            
-        bpy.data.materials.new(mat_name)
-        bpy.data.materials[mat_name].diffuse_color = (color[0],color[1],color[2],1.0)
-        
-        if (bpy.context.scene.render.engine == 'CYCLES'):
-            bpy.data.materials[mat_name].use_nodes = True
-            # connect emission node with material output node
-            bpy.data.materials[mat_name].node_tree.nodes.new(type='ShaderNodeEmission')
-            inp = bpy.data.materials[mat_name].node_tree.nodes['Material Output'].inputs['Surface']
-            outp = bpy.data.materials[mat_name].node_tree.nodes['Emission'].outputs['Emission']
-            bpy.data.materials[mat_name].node_tree.links.new(inp,outp)
-
-            # connect light path node to emission node
-            bpy.data.materials[mat_name].node_tree.nodes.new(type='ShaderNodeLightPath')
-            inp = bpy.data.materials[mat_name].node_tree.nodes['Emission'].inputs['Strength']
-            outp = bpy.data.materials[mat_name].node_tree.nodes['Light Path'].outputs['Is Camera Ray']
-            bpy.data.materials[mat_name].node_tree.links.new(inp,outp)
-
-            # Change emission color
-            bpy.data.materials[mat_name].node_tree.nodes['Emission'].inputs['Color'].default_value = (color[0],color[1],color[2],1.0)
-        
-        return bpy.data.materials[mat_name]
+        return MaterialPool().get(color, id)
 
     # Create a number of colors with similar, hue, saturation and value as a target color.
+    # The colors are random, but the same for the same target color, so
+    # rebuilding a visualization keeps its colors (and pooled materials).
     def create_adjacent_colors(self, primary_color, amount):
+        rng = random.Random('{0:.3f},{1:.3f},{2:.3f}'.format(primary_color[0], primary_color[1], primary_color[2]))
         colors = []
         influence_pool = 0.3
         influencers = [0.1,0.1]        
@@ -115,14 +157,14 @@ class Utils():
         flipper = 1
         for x in range(amount):
             color = primary_color.copy()
-            color.h = color.h + random.uniform(0.00,0.05) * flipper # select hue at random
+            color.h = color.h + rng.uniform(0.00,0.05) * flipper # select hue at random
             while (influence_pool > 0):
-                satval[0] += random.uniform(0.00,influencers[0])
+                satval[0] += rng.uniform(0.00,influencers[0])
                 influence_pool -= abs(satval[0])
                 if (influence_pool > 0):
-                    satval[1] += random.uniform(0.00,influencers[1])
+                    satval[1] += rng.uniform(0.00,influencers[1])
                     influence_pool -= abs(satval[1])
-            random.shuffle(satval)
+            rng.shuffle(satval)
             color.s = color.s + satval[0]
             color.v = color.v + satval[1]
             colors.append(color)
@@ -134,107 +176,649 @@ class Utils():
         return colors
     
 
-# DataStorage is essentially a class around a two-dimensional array with 
+# MaterialPool hands out materials keyed by render engine, color and
+# shading mode, reusing existing datablocks instead of creating a new
+# material on every import. The key is stored on each material, so
+# pooled materials are recognized after the .blend is reloaded.
+# Blender counts the users of each material; collect() removes pooled
+# materials which are no longer used, e.g. after a re-import.
+class MaterialPool():
+
+    KEY = 'csv_importer_material'
+
+    def __key(self, color, shading):
+        engine = bpy.context.scene.render.engine
+        return '{0}|{1}|{2:.3f},{3:.3f},{4:.3f}'.format(engine, shading, color[0], color[1], color[2])
+
+    def get(self, color, id='Visualization', shading='SHADELESS'):
+        key = self.__key(color, shading)
+        for mat in bpy.data.materials:
+            if (mat.get(self.KEY) == key):
+                return mat
+
+        mat = self.__create_shadeless(color, id)
+        mat[self.KEY] = key
+        return mat
+
+    # removes pooled materials without users.
+    def collect(self):
+        for mat in list(bpy.data.materials):
+            if (mat.get(self.KEY) is not None and mat.users == 0):
+                bpy.data.materials.remove(mat)
+
+    # Based on:
+    # https://gifguide2code.wordpress.com/2017/04/09/python-how-to-code-materials-in-blender-cycles/
+    def __create_shadeless(self, color, id):
+        mat = bpy.data.materials.new(id)
+        mat.diffuse_color = (color[0],color[1],color[2],1.0)
+        
+        if (bpy.context.scene.render.engine == 'CYCLES'):
+            mat.use_nodes = True
+            nodes = mat.node_tree.nodes
+            links = mat.node_tree.links
+            # connect emission node with material output node
+            emission = nodes.new(type='ShaderNodeEmission')
+            links.new(nodes['Material Output'].inputs['Surface'], emission.outputs['Emission'])
+
+            # connect light path node to emission node
+            light_path = nodes.new(type='ShaderNodeLightPath')
+            links.new(emission.inputs['Strength'], light_path.outputs['Is Camera Ray'])
+
+            # Change emission color
+            emission.inputs['Color'].default_value = (color[0],color[1],color[2],1.0)
+        
+        return mat
+
+
+# Binning assigns numeric values to bins in a single pass.
+# Bins are half-open [low, high) except for the last one, which
+# includes its upper edge, so every value is counted exactly once.
+# Bins are either of equal width, quantiles of the data or
+# custom edges given as a comma-separated string.
+class Binning():
+
+    EQUAL = 'EQUAL'
+    QUANTILE = 'QUANTILE'
+    CUSTOM = 'CUSTOM'
+
+    split = 3
+    mode = EQUAL
+    edges = None
+
+    def __init__(self, split=3, mode='EQUAL', edges=None):
+        self.split = split
+        self.mode = mode
+        if (isinstance(edges, str)):
+            edges = [float(e) for e in edges.replace(';', ',').split(',') if e.strip()]
+        self.edges = sorted(edges) if edges else None
+
+    def key(self):
+        return (self.split, self.mode, tuple(self.edges or ()))
+
+    # returns the bin edges for values in [min_value, max_value].
+    # Quantile bins need the values (or a sample of them).
+    def get_edges(self, min_value, max_value, values=None):
+        if (self.mode == self.CUSTOM):
+            if (self.edges is None or len(self.edges) < 2):
+                raise ValueError('Custom bins require at least two edges')
+            return numpy.array(self.edges, dtype=numpy.float64)
+        if (self.mode == self.QUANTILE and values is not None and len(values)):
+            edges = numpy.unique(numpy.quantile(values, numpy.linspace(0.0, 1.0, self.split + 1)))
+            # constant values have a single edge and fall back to a bin around it
+            if (len(edges) >= 2):
+                return edges
+            min_value = max_value = edges[0]
+        if (min_value == max_value):
+            min_value -= 0.5
+            max_value += 0.5
+        return numpy.linspace(min_value, max_value, self.split + 1)
+
+    # counts values per bin. NaN values and values outside the edges are skipped.
+    def count(self, values, edges):
+        values = values[~numpy.isnan(values)]
+        if (self.mode == self.EQUAL):
+            # equal widths take numpy's linear-time path instead of a search
+            counts, _ = numpy.histogram(values, bins=len(edges) - 1, range=(edges[0], edges[-1]))
+        else:
+            counts, _ = numpy.histogram(values, bins=edges)
+        return counts
+
+    # returns the bin of each value, or -1 for NaN values and values outside the edges.
+    def codes(self, values, edges):
+        codes = numpy.searchsorted(edges, values, side='right') - 1
+        codes[values == edges[-1]] = len(edges) - 2
+        codes[codes >= len(edges) - 1] = -1
+        return codes
+
+    def get_labels(self, edges):
+        return ['{0:.2f} - {1:.2f}'.format(lv, hv) for (lv, hv) in zip(edges[:-1], edges[1:])]
+
+
+# GroupAggregator computes the count, sum, mean, min, max and standard
+# deviation of values per group in one pass over integer group codes,
+# as given by the category codes of a CategoricalColumn or by bins.
+# Each batch of values is merged into the running moments of its groups
+# (Chan et al.), so appended rows and streamed chunks are added without
+# visiting earlier values again. NaN values and negative codes are skipped.
+class GroupAggregator():
+
+    COUNT = 'COUNT'
+    SUM = 'SUM'
+    MEAN = 'MEAN'
+    MIN = 'MIN'
+    MAX = 'MAX'
+    STDDEV = 'STDDEV'
+
+    def __init__(self):
+        self.count = numpy.zeros(0, dtype=numpy.int64)
+        self.sum = numpy.zeros(0)
+        self.mean = numpy.zeros(0)
+        self.m2 = numpy.zeros(0)
+        self.min = numpy.zeros(0)
+        self.max = numpy.zeros(0)
+
+    def copy(self):
+        groups = GroupAggregator()
+        for name in ('count', 'sum', 'mean', 'm2', 'min', 'max'):
+            setattr(groups, name, getattr(self, name).copy())
+        return groups
+
+    def __grow(self, size):
+        grow = size - len(self.count)
+        if (grow <= 0):
+            return
+        self.count = numpy.concatenate((self.count, numpy.zeros(grow, dtype=numpy.int64)))
+        self.sum = numpy.concatenate((self.sum, numpy.zeros(grow)))
+        self.mean = numpy.concatenate((self.mean, numpy.zeros(grow)))
+        self.m2 = numpy.concatenate((self.m2, numpy.zeros(grow)))
+        self.min = numpy.concatenate((self.min, numpy.full(grow, numpy.inf)))
+        self.max = numpy.concatenate((self.max, numpy.full(grow, -numpy.inf)))
+
+    # adds values to the groups given by codes.
+    # groups is the amount of groups there are at least.
+    def add(self, codes, values, groups=0):
+        keep = (codes >= 0) & ~numpy.isnan(values)
+        codes = codes[keep].astype(numpy.int64)
+        values = values[keep]
+        size = max(groups, int(codes.max()) + 1 if len(codes) else 0)
+        self.__grow(size)
+        if (len(codes) == 0):
+            return
+
+        count = numpy.bincount(codes, minlength=size)
+        total = numpy.bincount(codes, weights=values, minlength=size)
+        mean = total / numpy.maximum(count, 1)
+        m2 = numpy.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=size)
+
+        merged = self.count + count
+        delta = mean - self.mean
+        share = count / numpy.maximum(merged, 1)
+        self.m2 += m2 + delta ** 2 * self.count * share
+        self.mean += delta * share
+        self.sum += total
+        self.count = merged
+        numpy.minimum.at(self.min, codes, values)
+        numpy.maximum.at(self.max, codes, values)
+
+    # returns the aggregate of each group as a list.
+    # Groups without values are 0.
+    def result(self, aggregate):
+        empty = self.count == 0
+        if (aggregate == self.COUNT):
+            values = self.count.astype(numpy.float64)
+        elif (aggregate == self.SUM):
+            values = self.sum
+        elif (aggregate == self.MEAN):
+            values = self.mean
+        elif (aggregate == self.MIN):
+            values = numpy.where(empty, 0.0, self.min)
+        elif (aggregate == self.MAX):
+            values = numpy.where(empty, 0.0, self.max)
+        elif (aggregate == self.STDDEV):
+            values = numpy.sqrt(self.m2 / numpy.maximum(self.count, 1))
+        else:
+            raise ValueError('Unknown aggregate: {0}'.format(aggregate))
+        return [float(v) for v in values]
+
+
+# CategoricalColumn stores a string column dictionary-encoded: an array
+# of integer codes indexing a table of categories, which is built in a
+# single hashing pass while values are appended. Categories are kept in
+# order of first appearance. Indexing and iteration return the strings.
+# index maps each category to its code and categories lists them by code;
+# the two are extended together.
+class CategoricalColumn():
+
+    codes = None
+    index = None
+    categories = None
+
+    def __init__(self):
+        self.codes = array('i')
+        self.index = {}
+        self.categories = []
+
+    def append(self, value):
+        self.extend((value,))
+
+    def extend(self, values):
+        self.codes.extend(self.__code(v) for v in values)
+
+    # appends values given as codes into the categories of another
+    # table, translating them to the codes of this column.
+    def extend_encoded(self, codes, categories):
+        lookup = numpy.array([self.__code(c) for c in categories], dtype=numpy.intc)
+        self.codes.frombytes(lookup[numpy.frombuffer(codes, dtype=numpy.intc)].tobytes())
+
+    # returns the code of a value, adding it as a new category if needed.
+    def __code(self, value):
+        code = self.index.get(value)
+        if (code is None):
+            code = self.index[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    # sets the categories, as read back from a cache.
+    def set_categories(self, categories):
+        self.categories = list(categories)
+        self.index = {c: k for (k, c) in enumerate(self.categories)}
+
+    # returns a numpy view on the codes, see DataStorage.numeric_view.
+    def code_view(self):
+        return numpy.frombuffer(self.codes, dtype=numpy.intc)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        categories = self.categories
+        if (isinstance(i, slice)):
+            return [categories[c] for c in self.codes[i]]
+        return categories[self.codes[i]]
+
+    def __iter__(self):
+        categories = self.categories
+        return (categories[c] for c in self.codes)
+
+
+# DataStorage is a columnar store for a parsed dataset with
 # functions to store dataset headers, extract frequencies etc.
+# The type of each column is inferred once from a sample of rows:
+# numeric columns are kept in contiguous array('d') buffers
+# (missing or malformed cells become NaN) and string columns
+# dictionary-encoded in CategoricalColumns.
+# A projection (the indices of the columns a visualization uses)
+# limits which columns are stored; the other columns are skipped
+# without converting their cells and kept as None.
 class DataStorage():
-    
-    data = None
-    data_numeric = None
+
+    NUMERIC = 'NUMERIC'
+    STRING = 'STRING'
+
+    # amount of rows used to infer column types
+    sample_size = 20
+
+    columns = None
+    types = None
     headers = None
+    projection = None
+
+    def __init__(self, types=None, projection=None):
+        self.columns = None
+        self.types = None
+        self.projection = projection
+        self.__pending = []
+        self.__stats = {}
+        self.__updates = {}
+        if (types is not None):
+            self.__create_columns(types)
+
+    def __create_columns(self, types):
+        self.types = list(types)
+        if (self.projection is not None and self.types):
+            # Columns beyond the last one refer to the last column, like
+            # the column settings of the visualizers. At least one column
+            # is stored, so the amount of rows is known.
+            last = len(self.types) - 1
+            self.projection = sorted({min(j, last) for j in self.projection} or {0})
+        self.columns = []
+        for (j, t) in enumerate(self.types):
+            if (self.projection is not None and j not in self.projection):
+                self.columns.append(None)
+            elif (t == self.NUMERIC):
+                self.columns.append(array('d'))
+            else:
+                self.columns.append(CategoricalColumn())
+
+    # returns whether a column is stored
+    def is_stored(self, column):
+        return self.columns[column] is not None
+
+    # stores rows buffered for type inference, inferring the
+    # column types from them if this has not happened yet.
+    def flush(self):
+        if (self.columns is None and self.__pending):
+            self.__create_columns(Utils().infer_column_types(self.__pending))
+        if (self.__pending):
+            rows = self.__pending
+            self.__pending = []
+            self.add_rows(rows)
+
+    def add_row(self, row):
+        if (not row):
+            return
+        # Buffer rows until enough have arrived to infer column types.
+        if (self.columns is None):
+            self.__pending.append(row)
+            if (len(self.__pending) >= self.sample_size):
+                self.flush()
+            return
+        self.add_rows((row,))
 
-    def __init__(self, d = None):
-        self.data = d
-    
-    def add_row(self, row):        
-        # TODO: zero-pad all entries if the length of a row exceeds already added rows.
-        # Use the length of the first row to determine amount of columns
-        if (self.data == None):
-            self.data = []
-            self.data = [[] for i in range(len(row))]
-        utils = Utils()
+    def add_rows(self, rows):
+        if (self.columns is None):
+            for row in rows:
+                self.add_row(row)
+            return
+
+        # Skip blank lines, pad short rows and truncate long
+        # rows to the amount of columns.
+        width = len(self.columns)
+        rows = [row if len(row) == width else (list(row) + [''] * width)[:width] for row in rows if row]
+        if (not rows):
+            return
+        start = self.__length()
 
-        # Append values from each parsed row into the array.
-        for (j,v) in enumerate(row):
-            if (utils.is_number(v)):
-                self.data[j].append(float(v))
+        if (self.projection is None):
+            columns = enumerate(zip(*rows))
+        else:
+            columns = ((j, [row[j] for row in rows]) for j in self.projection)
+
+        # Append each column in bulk, converting numeric cells exactly once.
+        for (j, values) in columns:
+            column = self.columns[j]
+            if (self.types[j] == self.NUMERIC):
+                try:
+                    column.extend(map(float, values))
+                except ValueError:
+                    # drop the values converted before the bad cell
+                    del column[start:]
+                    column.extend(self.__to_float(v) for v in values)
             else:
-                self.data[j].append(v)
-    
+                column.extend(values)
+
+        # Statistics of the previous rows are brought up to date.
+        self.invalidate(start)
+
+    # appends columns which were parsed into another DataStorage of the
+    # same types, given as an array('d') for each numeric column and a
+    # (codes, categories) tuple for each string column.
+    def extend_columns(self, columns):
+        self.flush()
+        start = self.row_count()
+        for (j, values) in enumerate(columns):
+            if (self.columns[j] is None):
+                continue
+            if (self.types[j] == self.NUMERIC):
+                self.columns[j].extend(values)
+            else:
+                self.columns[j].extend_encoded(*values)
+        self.invalidate(start)
+
+    def __to_float(self, v):
+        try:
+            return float(v)
+        except ValueError:
+            return float('nan')
+
+    def row_count(self):
+        self.flush()
+        return self.__length()
+
+    def __length(self):
+        for column in (self.columns or ()):
+            if (column is not None):
+                return len(column)
+        return 0
+
+    # returns the memoized result of compute() stored under key.
+    # When rows are appended, update(result, start) brings the result up
+    # to date from the rows appended at index start, or returns None if it
+    # has to be computed again. Results without update are dropped.
+    def memoize(self, key, compute, update=None):
+        if (key not in self.__stats):
+            self.__stats[key] = compute()
+            if (update is not None):
+                self.__updates[key] = update
+        return self.__stats[key]
+
+    # drops memoized results, or updates them from the rows
+    # appended at index start where possible.
+    def invalidate(self, start=None):
+        stats = self.__stats
+        updates = self.__updates
+        self.__stats = {}
+        self.__updates = {}
+        if (start is None):
+            return
+        for (key, update) in updates.items():
+            value = update(stats[key], start)
+            if (value is not None):
+                self.__stats[key] = value
+                self.__updates[key] = update
+
+    # returns a summary of a column as a dictionary with the amount
+    # of values, min and max of numeric columns and the categories
+    # of string columns. NaN values are not counted.
+    def get_summary(self, column):
+        return self.memoize(('summary', column), lambda: self.summarize(column),
+                            lambda summary, start: self.__update_summary(column, summary, start))
+
+    def __update_summary(self, column, summary, start):
+        if (not self.is_numeric(column)):
+            return self.summarize(column)
+        values = self.numeric_view(column)[start:]
+        finite = values[~numpy.isnan(values)]
+        if (len(finite) == 0):
+            return summary
+        if (summary['count'] == 0):
+            return {'count': len(finite), 'min': float(finite.min()), 'max': float(finite.max())}
+        return {'count': summary['count'] + len(finite),
+                'min': min(summary['min'], float(finite.min())),
+                'max': max(summary['max'], float(finite.max()))}
+
+    def summarize(self, column):
+        if (not self.is_numeric(column)):
+            categories = list(self.columns[column].categories)
+            return {'count': len(self.columns[column]), 'categories': categories}
+        values = self.numeric_view(column)
+        finite = values[~numpy.isnan(values)]
+        if (len(finite) == 0):
+            return {'count': 0, 'min': None, 'max': None}
+        return {'count': len(finite), 'min': float(finite.min()), 'max': float(finite.max())}
+
+    def column_count(self):
+        self.flush()
+        if (not self.columns):
+            return 0
+        return len(self.columns)
+
+    def is_numeric(self, column):
+        self.flush()
+        return self.types[column] == self.NUMERIC
+
+    # yields the dataset as a sequence of DataStorage chunks.
+    # An in-memory dataset is a single chunk.
+    def iter_chunks(self):
+        self.flush()
+        yield self
+
+    # returns a numpy view on a numeric column without copying it.
+    # The view must not outlive the caller, since a buffer exported
+    # from an array('d') prevents it from growing.
+    def numeric_view(self, column):
+        self.flush()
+        return numpy.frombuffer(self.columns[column], dtype=numpy.float64)
+
     def get_columns(self, type=''):
-        utils = Utils()
-        data = self.data
+        self.flush()
+        columns = self.columns
+        if (columns is None):
+            return []
 
-        # AS_NUMERIC converts string data to numeric representations
+        # AS_NUMERIC returns string data as its numeric representation,
+        # which is the index of each value in the category table.
         if (type == 'AS_NUMERIC'):
-            # Loop through each column
-            for i in range(len(data)):
-                # Check if the first value is a number, skip if true.
-                if (utils.is_number(data[i][0])):
-                    continue
-                else:
-                    # Learn what categories are here
-                    cate_count, categories = self.get_string_frequencies(i)
-                    # Run through each string value
-                    # Use the index of the category name as numerical representation
-                    for j in range(len(data[i])):
-                        data[i][j] = categories.index(data[i][j])                        
-        return data
+            columns = [c.codes if self.types[i] == self.STRING and c is not None else c for (i, c) in enumerate(columns)]
+        return columns
 
+    # Counts are memoized and updated from appended rows only.
     def get_string_frequencies(self, column):
-        data = self.data
-        categories = []
-        cate_count = []
-        
-        cnt = Counter()
-        for word in data[column]:
-            cnt[word] += 1
-        
-        categories = list(cnt.keys())
-        cate_count = list(cnt.values())
-            
-        return (cate_count, categories)     
-            
-    def get_numeric_frequencies(self, column, split):
-        data = self.data
-        max_value = max(data[column])
-        min_value = min(data[column])
-        data_range = max_value - min_value
-        divide = data_range / split
-        categories = []
-        cate_count = []
-
-        for i in range(0, split):            
-            # Calculate lowest value and highest value for each category
-            # Rounding to 2 decimals fixes some gaps (but not all..)
-            lv = min_value + (divide * i)
-            hv = min_value + (divide * (i+1))
+        self.flush()
+        return self.memoize(('counts', column), lambda: self.__count_categories(column, 0),
+                            lambda counts, start: self.__count_categories(column, start, counts))
+
+    def __count_categories(self, column, start, counts=None):
+        column = self.columns[column]
+        # a copy, since the memoized counts must not grow with the column
+        categories = list(column.categories)
+        cate_count = [int(c) for c in numpy.bincount(column.code_view()[start:], minlength=len(categories))]
+        if (counts is not None):
+            for (i, c) in enumerate(counts[0]):
+                cate_count[i] += c
 
-            # Create category name
-            categories.append(str('{0:.2f}'.format(lv)) + ' - ' + str('{0:.2f}'.format(hv)))      
-            
-            # initialize cate_counts
-            cate_count.append(0)
-            
-            # Find numbers which fit in category.
-            for j in range(len(data[column])):
-                v = data[column][j]
-                if (v <= hv and v >= lv):
-                    cate_count[i] += 1
-                                
         return (cate_count, categories)
 
-    def get_frequencies(self, column, output_type='', split=None):
-        utils = Utils()
-        data = self.data
+    def get_numeric_frequencies(self, column, binning):
+        counts = self.__bins(column, binning)
+        return (counts[0], counts[1])
+
+    # returns the memoized counts, labels, edges and value range of the bins of a column.
+    def __bins(self, column, binning):
+        key = ('counts', column, binning.key())
+        return self.memoize(key, lambda: self.__count_bins(column, binning),
+                            lambda counts, start: self.__update_bins(column, binning, counts, start))
+
+    def __count_bins(self, column, binning):
+        summary = self.get_summary(column)
+        if (summary['count'] == 0):
+            return ([], [], None, None)
+        values = self.numeric_view(column)
+        finite = values[~numpy.isnan(values)]
+
+        edges = binning.get_edges(summary['min'], summary['max'], finite)
+        cate_count = [int(c) for c in binning.count(finite, edges)]
+        categories = binning.get_labels(edges)
+
+        return (cate_count, categories, edges, (summary['min'], summary['max']))
+
+    # appended values are counted into the existing bins as long as
+    # the bin edges stay the same: quantile edges depend on every value
+    # and equal width edges on the range of the values.
+    def __update_bins(self, column, binning, counts, start):
+        cate_count, categories, edges, value_range = counts
+        if (edges is None or binning.mode == Binning.QUANTILE):
+            return None
+        values = self.numeric_view(column)[start:]
+        values = values[~numpy.isnan(values)]
+        if (len(values) == 0):
+            return counts
+        if (binning.mode != Binning.CUSTOM and (values.min() < value_range[0] or values.max() > value_range[1])):
+            return None
+        added = binning.count(values, edges)
+        cate_count = [c + int(a) for (c, a) in zip(cate_count, added)]
+
+        return (cate_count, categories, edges, value_range)
+
+    # binning is a Binning; split is a shorthand for equal-width bins.
+    # Results are memoized per column, output type and binning.
+    def get_frequencies(self, column, output_type='', split=None, binning=None):
+        if (self.is_numeric(column)):
+            if (binning is None):
+                binning = Binning(split)
+            key = ('frequencies', column, output_type, binning.key())
+        else:
+            key = ('frequencies', column, output_type)
+
+        cate_count, categories = self.memoize(key, lambda: self.__frequencies(column, output_type, binning))
+        return (list(cate_count), list(categories))
+
+    def __frequencies(self, column, output_type, binning):
         cate_count = []
         categories = []
-        
-        if (utils.is_number(data[column][0])):
-            cate_count, categories = self.get_numeric_frequencies(column, split)
+
+        if (self.is_numeric(column)):
+            cate_count, categories = self.get_numeric_frequencies(column, binning)
         else:
             cate_count, categories = self.get_string_frequencies(column)
 
-        total = sum(c for c in cate_count)
+        return (self.__scale(cate_count, output_type), categories)
+
+    # returns the aggregate (see GroupAggregator) of value_column for each
+    # category of column. Numeric columns are grouped by binning. The
+    # aggregates are scaled like frequencies, see get_frequencies().
+    def get_aggregates(self, column, value_column, aggregate, output_type='', binning=None):
+        if (self.is_numeric(column)):
+            if (binning is None):
+                binning = Binning()
+            key = ('aggregates', column, value_column, aggregate, output_type, binning.key())
+        else:
+            key = ('aggregates', column, value_column, aggregate, output_type)
+
+        values, categories = self.memoize(key, lambda: self.__aggregates(column, value_column, aggregate,
+                                                                         output_type, binning))
+        return (list(values), list(categories))
+
+    def __aggregates(self, column, value_column, aggregate, output_type, binning):
+        groups, categories = self.get_groups(column, value_column, binning)
+        return (self.__scale(groups.result(aggregate), output_type), categories)
+
+    # returns a GroupAggregator of the values of value_column grouped by
+    # the categories or bins of column, and the categories. Groups are
+    # memoized and updated from appended rows only.
+    def get_groups(self, column, value_column, binning=None):
+        self.flush()
+        if (not self.is_numeric(value_column)):
+            raise ValueError('Only numeric columns can be aggregated')
+        if (self.is_numeric(column)):
+            key = ('groups', column, value_column, binning.key())
+        else:
+            key = ('groups', column, value_column)
+        groups = self.memoize(key, lambda: self.__group(column, value_column, binning, 0),
+                              lambda groups, start: self.__group(column, value_column, binning, start, groups))
+        return (groups[0], groups[1])
+
+    # groups the rows from index start, adding them to the groups of the
+    # previous rows. Bins which changed are grouped again from the start.
+    def __group(self, column, value_column, binning, start, groups=None):
+        edges = None
+        if (self.is_numeric(column)):
+            edges = self.__bins(column, binning)[2]
+            if (groups is not None and not numpy.array_equal(edges, groups[2])):
+                return None
+            if (edges is None):
+                return (GroupAggregator(), [], None)
+            categories = binning.get_labels(edges)
+            codes = binning.codes(self.numeric_view(column)[start:], edges)
+        else:
+            categories = list(self.columns[column].categories)
+            codes = self.columns[column].code_view()[start:]
+
+        # the groups may be memoized and must not be changed
+        aggregator = GroupAggregator() if groups is None else groups[0].copy()
+        aggregator.add(codes, self.numeric_view(value_column)[start:], len(categories))
+        return (aggregator, categories, edges)
+
+    # scales values to shares of their total, see get_frequencies().
+    def __scale(self, cate_count, output_type):
+        # the counts may be memoized and must not be changed
+        cate_count = list(cate_count)
+
+        # COUNT returns the amount of values in each category as is
+        if (output_type == 'COUNT'):
+            return cate_count
+
+        total = sum(abs(c) for c in cate_count) or 1
         
         if (output_type == 'DEGREES'):
             multiplier = 360
@@ -247,7 +831,596 @@ class DataStorage():
             cate_count[i] = float(cate_count[i]) / float(total)
             cate_count[i] = round(cate_count[i] * multiplier,2)
         
-        return (cate_count, categories)
+        return cate_count
+
+# ChunkedDataStorage is a DataStorage which never holds the whole dataset.
+# The file is streamed from a CSVReader in chunks of chunk_size rows and
+# frequencies, min/max and scatter points are accumulated chunk by chunk,
+# so peak memory depends on the chunk size instead of the file size.
+class ChunkedDataStorage(DataStorage):
+
+    reader = None
+    filepath = None
+    chunk_size = 10000
+    row_filter = None
+    # called with the share of the file read during each pass, see read_chunks()
+    progress = None
+
+    def __init__(self, reader, filepath, chunk_size=10000, projection=None, row_filter=None):
+        DataStorage.__init__(self, projection=projection)
+        self.reader = reader
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        self.row_filter = row_filter
+
+    # the sniffed format determines the column types of every chunk.
+    def __format(self):
+        csv_format = self.reader.read_format(self.filepath)
+        self.headers = csv_format.headers
+        return csv_format
+
+    def iter_chunks(self):
+        for rows in self.reader.read_chunks(self.filepath, self.chunk_size, self.progress):
+            chunk = DataStorage(self.reader.format.types, self.projection)
+            chunk.headers = self.reader.headers
+            if (self.row_filter is not None):
+                rows = self.row_filter.filter_rows(rows)
+            chunk.add_rows(rows)
+            chunk.flush()
+            self.headers = chunk.headers
+            yield chunk
+
+    def column_count(self):
+        return len(self.__format().types or [])
+
+    def is_stored(self, column):
+        if (self.projection is None):
+            return True
+        last = self.column_count() - 1
+        return column in {min(j, last) for j in self.projection}
+
+    def is_numeric(self, column):
+        return self.__format().types[column] == self.NUMERIC
+
+    def row_count(self):
+        return sum(chunk.row_count() for chunk in self.iter_chunks())
+
+    # the columns of a streamed dataset are never held at once.
+    def get_columns(self, type=''):
+        raise TypeError('The columns of a streamed dataset are read with iter_chunks()')
+
+    def get_string_frequencies(self, column):
+        cnt = Counter()
+        for chunk in self.iter_chunks():
+            cate_count, categories = chunk.get_string_frequencies(column)
+            for (category, count) in zip(categories, cate_count):
+                cnt[category] += count
+
+        return (list(cnt.values()), list(cnt.keys()))
+
+    def summarize(self, column):
+        if (not self.is_numeric(column)):
+            cate_count, categories = self.get_string_frequencies(column)
+            return {'count': sum(cate_count), 'categories': categories}
+
+        count = 0
+        min_value = float('inf')
+        max_value = float('-inf')
+        for chunk in self.iter_chunks():
+            summary = chunk.get_summary(column)
+            if (summary['count'] == 0):
+                continue
+            count += summary['count']
+            min_value = min(min_value, summary['min'])
+            max_value = max(max_value, summary['max'])
+        if (count == 0):
+            return {'count': 0, 'min': None, 'max': None}
+        return {'count': count, 'min': min_value, 'max': max_value}
+
+    # amount of values kept to estimate quantile bin edges
+    quantile_sample_size = 100000
+
+    def get_numeric_frequencies(self, column, binning):
+        # A last pass counts the bins.
+        edges = self.__edges(column, binning)
+        if (edges is None):
+            return ([], [])
+        counts = numpy.zeros(len(edges) - 1, dtype=numpy.int64)
+        for chunk in self.iter_chunks():
+            counts += binning.count(chunk.numeric_view(column), edges)
+
+        return ([int(c) for c in counts], binning.get_labels(edges))
+
+    # returns the bin edges of a column, or None if it has no values.
+    # The value range comes from the memoized summary; quantiles need
+    # an extra pass to sample the values.
+    def __edges(self, column, binning):
+        min_value = None
+        max_value = None
+        sample = None
+        if (binning.mode != Binning.CUSTOM):
+            summary = self.get_summary(column)
+            if (summary['count'] == 0):
+                return None
+            min_value = summary['min']
+            max_value = summary['max']
+        if (binning.mode == Binning.QUANTILE):
+            sample = numpy.empty(0)
+            seen = 0
+            for chunk in self.iter_chunks():
+                values = chunk.numeric_view(column)
+                values = values[~numpy.isnan(values)]
+                sample, seen = Utils().reservoir_update(sample, seen, values, self.quantile_sample_size)
+
+        return binning.get_edges(min_value, max_value, sample)
+
+    # categories are merged by their string across chunks, since
+    # the category codes of each chunk are its own.
+    def get_groups(self, column, value_column, binning=None):
+        if (not self.is_numeric(value_column)):
+            raise ValueError('Only numeric columns can be aggregated')
+        groups = GroupAggregator()
+        if (self.is_numeric(column)):
+            edges = self.__edges(column, binning)
+            if (edges is None):
+                return (groups, [])
+            categories = binning.get_labels(edges)
+            for chunk in self.iter_chunks():
+                codes = binning.codes(chunk.numeric_view(column), edges)
+                groups.add(codes, chunk.numeric_view(value_column), len(categories))
+            return (groups, categories)
+
+        index = {}
+        for chunk in self.iter_chunks():
+            categorical = chunk.columns[column]
+            codes = numpy.array([index.setdefault(c, len(index)) for c in categorical.categories], dtype=numpy.int64)
+            groups.add(codes[categorical.code_view()], chunk.numeric_view(value_column), len(index))
+        return (groups, list(index))
+
+
+# SpatialHash collapses points into weighted representatives in one pass.
+# Points in the same cell of a grid with the given cell size are merged
+# into their mean position, weighted by the amount of merged points.
+# A cell size of 0 merges identical points only.
+class SpatialHash():
+
+    cell_size = 0.0
+    # amount of times the cells were doubled by coarsen()
+    level = 0
+
+    def __init__(self, cell_size=0.0):
+        self.cell_size = cell_size
+        self.level = 0
+        self.cells = {}
+        self.sums = []
+        self.counts = []
+        self.rows = []
+
+    # returns the keys of the cells of an (n, 3) array of points.
+    def keys(self, points):
+        if (self.cell_size > 0):
+            # Doubled cells are derived from the initial cells with integer
+            # shifts, so a point always maps to the cell it was merged into.
+            base_size = self.cell_size / (1 << self.level)
+            return numpy.floor(points / base_size).astype(numpy.int64) >> self.level
+        # adding 0.0 turns -0.0 into 0.0, so both share a key
+        return points + 0.0
+
+    # adds an (n, 3) array of points, where first_row is the row of the first point.
+    def add(self, points, first_row=0):
+        if (len(points) == 0):
+            return
+        # merge the points of this batch with numpy, then merge
+        # the (fewer) occupied cells with the cells seen so far.
+        keys = self.keys(points)
+        unique, first, inverse, counts = numpy.unique(keys, axis=0, return_index=True,
+                                                      return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        sums = numpy.stack([numpy.bincount(inverse, weights=points[:,axis], minlength=len(unique))
+                            for axis in range(3)], axis=1)
+
+        cells = self.cells
+        for (k, key) in enumerate(map(tuple, unique.tolist())):
+            index = cells.get(key)
+            if (index is None):
+                cells[key] = len(self.counts)
+                self.sums.append(sums[k])
+                self.counts.append(int(counts[k]))
+                self.rows.append(first_row + int(first[k]))
+            else:
+                self.sums[index] = self.sums[index] + sums[k]
+                self.counts[index] += int(counts[k])
+
+    # doubles the cell size, merging the cells which now share a cell.
+    def coarsen(self):
+        cells, sums, counts, rows = (self.cells, self.sums, self.counts, self.rows)
+        self.cell_size *= 2
+        self.level += 1
+        self.cells = {}
+        self.sums = []
+        self.counts = []
+        self.rows = []
+        for (key, index) in cells.items():
+            key = tuple(k >> 1 for k in key)
+            merged = self.cells.get(key)
+            if (merged is None):
+                self.cells[key] = len(self.counts)
+                self.sums.append(sums[index])
+                self.counts.append(counts[index])
+                self.rows.append(rows[index])
+            else:
+                self.sums[merged] = self.sums[merged] + sums[index]
+                self.counts[merged] += counts[index]
+                self.rows[merged] = min(self.rows[merged], rows[index])
+
+    # returns the representative positions, their weights and the
+    # first row merged into each of them.
+    def get_points(self):
+        if (not self.counts):
+            return (numpy.zeros((0, 3)), [], [])
+        counts = numpy.array(self.counts, dtype=numpy.float64)
+        positions = numpy.array(self.sums) / counts[:,None]
+        return (positions, list(self.counts), list(self.rows))
+
+
+# PointSampler reduces a stream of points to at most budget points,
+# each weighted by the amount of points it represents:
+# RESERVOIR keeps a uniform random sample of the points.
+# STRATIFIED divides space into cells and samples every cell in
+# proportion to the amount of points in it, so sparse regions keep points.
+# VOXEL merges the points of a grid, whose cells are doubled in size
+# until there are no more than budget of them.
+# Only the sample is kept in memory, never the whole stream.
+class PointSampler():
+
+    RESERVOIR = 'RESERVOIR'
+    STRATIFIED = 'STRATIFIED'
+    VOXEL = 'VOXEL'
+
+    budget = 10000
+    method = RESERVOIR
+    cell_size = 0.0
+    # average amount of sampled points per cell of a stratified sample
+    stratum_size = 16
+
+    def __init__(self, budget=10000, method='RESERVOIR', cell_size=0.0):
+        self.budget = max(1, budget)
+        self.method = method
+        self.cell_size = cell_size
+
+    # batches is a function returning an iterator over (points, first_row)
+    # tuples, where points is an (n, 3) array. Stratified sampling iterates
+    # the batches twice. Returns the positions, weights and rows of the sample.
+    def sample(self, batches):
+        if (self.method == self.VOXEL):
+            return self.__voxels(batches, self.budget).get_points()
+        if (self.method == self.STRATIFIED):
+            return self.__stratified(batches)
+        return self.__reservoir(batches)
+
+    # the points of a batch followed by their rows, in a single array
+    def __records(self, points, first_row):
+        return numpy.column_stack((points, first_row + numpy.arange(len(points))))
+
+    def __result(self, samples, weights):
+        if (not samples):
+            return (numpy.zeros((0, 3)), [], [])
+        records = numpy.concatenate(samples)
+        weights = numpy.concatenate(weights)
+        order = numpy.argsort(records[:,3], kind='stable')
+        return (records[order,:3], weights[order].tolist(), records[order,3].astype(numpy.int64).tolist())
+
+    def __reservoir(self, batches):
+        reservoir = numpy.zeros((0, 4))
+        seen = 0
+        for (points, first_row) in batches():
+            reservoir, seen = Utils().reservoir_update(reservoir, seen, self.__records(points, first_row), self.budget)
+        if (len(reservoir) == 0):
+            return self.__result([], [])
+        return self.__result([reservoir], [numpy.full(len(reservoir), seen / len(reservoir))])
+
+    def __voxels(self, batches, limit):
+        spatial_hash = None
+        for (points, first_row) in batches():
+            if (len(points) == 0):
+                continue
+            if (spatial_hash is None):
+                spatial_hash = SpatialHash(self.cell_size or self.__initial_cell_size(points, limit))
+            spatial_hash.add(points, first_row)
+            # Cells never grow across the origin, so up to
+            # 8 cells (one per octant) remain however large they are.
+            while (len(spatial_hash.counts) > max(limit, 8)):
+                spatial_hash.coarsen()
+        return spatial_hash or SpatialHash()
+
+    # a cell size which is too small rather than too large, since
+    # cells can only be doubled.
+    def __initial_cell_size(self, points, limit):
+        extent = float((points.max(axis=0) - points.min(axis=0)).max())
+        if (extent == 0):
+            return 1.0
+        return extent / limit
+
+    def __stratified(self, batches):
+        # The first pass counts the points per cell, the second pass keeps
+        # a reservoir of each cell, sized in proportion to that count.
+        strata = self.__voxels(batches, max(1, self.budget // self.stratum_size))
+        if (not strata.counts):
+            return self.__result([], [])
+        counts = numpy.array(strata.counts, dtype=numpy.float64)
+        sizes = self.__allocate(counts)
+
+        reservoirs = [numpy.zeros((0, 4)) for c in counts]
+        seen = [0] * len(counts)
+        for (points, first_row) in batches():
+            if (len(points) == 0):
+                continue
+            records = self.__records(points, first_row)
+            unique, inverse = numpy.unique(strata.keys(points), axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            order = numpy.argsort(inverse, kind='stable')
+            groups = numpy.split(records[order], numpy.cumsum(numpy.bincount(inverse))[:-1])
+            for (key, group) in zip(map(tuple, unique.tolist()), groups):
+                s = strata.cells[key]
+                reservoirs[s], seen[s] = Utils().reservoir_update(reservoirs[s], seen[s], group, sizes[s])
+
+        weights = [numpy.full(len(r), seen[s] / len(r)) for (s, r) in enumerate(reservoirs)]
+        return self.__result(reservoirs, weights)
+
+    # divides the budget between cells in proportion to their amount of
+    # points, with at least one point per cell.
+    def __allocate(self, counts):
+        spare = max(0, self.budget - len(counts))
+        shares = spare * counts / counts.sum()
+        sizes = numpy.floor(shares).astype(numpy.int64)
+        remainder = spare - int(sizes.sum())
+        if (remainder > 0):
+            sizes[numpy.argsort(sizes - shares)[:remainder]] += 1
+        return (sizes + 1).tolist()
+
+
+# SceneBuilder creates the objects of a visualization directly through
+# bpy.data instead of operators, so building neither walks the whole
+# scene per object nor changes the selection. New objects are linked
+# into the collection of the visualization in one batch by finish().
+#
+# Objects are identified by a key which is stable across imports, e.g.
+# the visualizer, role and category of the object. When rebuilding a
+# visualization, objects of the previous build with the same key are
+# updated in place (transform, mesh data, text), and only the difference
+# is created or removed.
+class SceneBuilder():
+
+    KEY = 'csv_importer_key'
+
+    collection = None
+    objects = None
+    prefix = ''
+
+    def __init__(self, parent=None, prefix=''):
+        self.objects = []
+        self.prefix = prefix
+        self.existing = {}
+        self.stale = []
+        scene = bpy.context.scene
+        if (parent is None):
+            self.collection = scene.collection
+            return
+        # every visualization gets a dedicated collection
+        name = parent.name + 'Objects'
+        collection = bpy.data.collections.get(name)
+        if (collection is None):
+            collection = bpy.data.collections.new(name)
+            scene.collection.children.link(collection)
+        self.collection = collection
+        self.__index(parent.children)
+
+    # collects the objects of the previous build by key
+    def __index(self, objects):
+        for ob in objects:
+            key = ob.get(self.KEY)
+            if (key is None or key in self.existing):
+                self.stale.append(ob)
+            else:
+                self.existing[key] = ob
+            self.__index(ob.children)
+
+    # returns the object of the previous build with this key, if its data
+    # is of the given type (None for empties). The object is reset to be
+    # built again: linked copies to the rotation and scale of their source,
+    # like a new copy, and generated objects to identity.
+    def __reuse(self, key, kind, source=None):
+        if (key is None):
+            return None
+        ob = self.existing.pop(self.prefix + key, None)
+        if (ob is None):
+            return None
+        if ((ob.data is None) != (kind is None) or (kind is not None and not isinstance(ob.data, kind))):
+            self.stale.append(ob)
+            return None
+        ob.animation_data_clear()
+        if (source is not None):
+            ob.rotation_euler = tuple(source.rotation_euler)
+            ob.scale = tuple(source.scale)
+        else:
+            ob.rotation_euler = (0,0,0)
+            ob.scale = (1,1,1)
+        return ob
+
+    def __claim(self, ob, key, name, location):
+        if (ob.name != name):
+            ob.name = name
+        ob.location = location
+        if (key is not None):
+            ob[self.KEY] = self.prefix + key
+        return ob
+
+    def add_object(self, name, data=None, location=(0,0,0), key=None):
+        ob = self.__reuse(key, type(data) if data is not None else None)
+        if (ob is None):
+            ob = bpy.data.objects.new(name, data)
+            self.objects.append(ob)
+        elif (ob.data != data):
+            previous = ob.data
+            ob.data = data
+            self.__remove_data(previous)
+        return self.__claim(ob, key, name, location)
+
+    def add_empty(self, name, size=0.1, location=(0,0,0), key=None):
+        ob = self.add_object(name, None, location, key)
+        ob.empty_display_size = size
+        return ob
+
+    # adds a linked duplicate of an object, sharing its data.
+    def add_linked_copy(self, source, name, location=(0,0,0), key=None):
+        ob = self.__reuse(key, type(source.data) if source.data is not None else None, source)
+        if (ob is not None and ob.data != source.data):
+            self.stale.append(ob)
+            ob = None
+        if (ob is None):
+            ob = source.copy()
+            ob.animation_data_clear()
+            self.objects.append(ob)
+        return self.__claim(ob, key, name, location)
+
+    def add_text(self, name, body, location=(0,0,0), scale=1.0, material=None, align_x='CENTER', key=None):
+        ob = self.__reuse(key, bpy.types.TextCurve)
+        curve = ob.data if ob is not None else bpy.data.curves.new(name, type='FONT')
+        curve.body = body
+        curve.align_x = align_x
+        ob = self.add_object(name, curve, location, key) if ob is None else self.__claim(ob, key, name, location)
+        ob.scale = (scale, scale, scale)
+        self.set_material(ob, material)
+        return ob
+
+    # returns an empty mesh for the object with this key: the mesh of
+    # the previous build, cleared, or a new one.
+    def get_mesh(self, name, key=None):
+        ob = self.existing.get(self.prefix + key) if key is not None else None
+        if (ob is not None and isinstance(ob.data, bpy.types.Mesh) and hasattr(ob.data, 'clear_geometry')):
+            mesh = ob.data
+            mesh.clear_geometry()
+            mesh.materials.clear()
+            return mesh
+        return bpy.data.meshes.new(name)
+
+    def add_mesh(self, name, vertices, faces, edges=(), location=(0,0,0), material=None, key=None):
+        mesh = self.get_mesh(name, key)
+        mesh.from_pydata(vertices, edges, faces)
+        mesh.update()
+        ob = self.add_object(name, mesh, location, key)
+        self.set_material(ob, material)
+        return ob
+
+    def set_material(self, ob, material):
+        if (material is None):
+            return
+        if (len(ob.data.materials) == 0):
+            ob.data.materials.append(material)
+        else:
+            ob.data.materials[0] = material
+
+    # links all new objects into the collection in one batch and removes
+    # the objects of the previous build which were not built again.
+    def finish(self):
+        link = self.collection.objects.link
+        for ob in self.objects:
+            link(ob)
+        objects = self.objects
+        self.objects = []
+
+        # every descendant of the previous build was indexed, so children
+        # which were built again must not be removed along with a parent.
+        self.remove_objects(self.stale + list(self.existing.values()), recursive=False)
+        self.stale = []
+        self.existing = {}
+        return objects
+
+    # removes objects (and their children if recursive), along with
+    # data no longer used.
+    def remove_objects(self, objects, recursive=True):
+        for ob in list(objects):
+            self.__remove_object(ob, recursive)
+
+    def __remove_object(self, ob, recursive):
+        try:
+            children = list(ob.children) if recursive else []
+        except ReferenceError:
+            # already removed along with its parent
+            return
+        for child in children:
+            self.__remove_object(child, recursive)
+        data = ob.data
+        # the full resolution mesh of a point cloud has only a fake user
+        full = get_named_mesh(ob, ScatterVisualizer.FULL_KEY)
+        bpy.data.objects.remove(ob)
+        self.__remove_data(data)
+        if (full is not None):
+            bpy.data.meshes.remove(full)
+
+    def __remove_data(self, data):
+        if (data is not None and data.users == 0):
+            if (isinstance(data, bpy.types.Mesh)):
+                bpy.data.meshes.remove(data)
+            elif (isinstance(data, bpy.types.Curve)):
+                bpy.data.curves.remove(data)
+
+
+# KeyframeWriter animates objects without changing the current frame.
+# It creates the action and F-curves of an object directly and fills
+# their keyframes in bulk, instead of inserting them one at a time.
+class KeyframeWriter():
+
+    # returns the start frame of each of count objects, spreading
+    # the starts over the duration of the animation.
+    def stagger(self, count, duration, start_frame):
+        if (count == 0):
+            return []
+        offset = float(duration) / float(count)
+        return (start_frame + numpy.floor(numpy.arange(count) * offset)).tolist()
+
+    # keys the property data_path of ob to values[i] at frames[i].
+    # Existing keyframes of the property are replaced.
+    def add(self, ob, data_path, frames, values):
+        anim = ob.animation_data_create()
+        action = anim.action
+        if (action is None):
+            action = bpy.data.actions.new(ob.name + 'Action')
+            anim.action = action
+
+        co = numpy.empty(2 * len(frames))
+        co[0::2] = frames
+        for index in range(len(values[0])):
+            fcurve = action.fcurves.find(data_path, index=index)
+            if (fcurve is not None):
+                action.fcurves.remove(fcurve)
+            fcurve = action.fcurves.new(data_path, index=index)
+            fcurve.keyframe_points.add(len(frames))
+            co[1::2] = [v[index] for v in values]
+            fcurve.keyframe_points.foreach_set('co', co)
+            fcurve.update()
+
+        # start out in the state of the first keyframe
+        setattr(ob, data_path, values[0])
+
+
+# returns the values charted for each category of a column and the
+# categories: the frequencies of the categories or, if the visualization
+# aggregates, the aggregate of the value column in each category.
+def get_chart_values(dataStore, props, column, output_type, binning):
+    if (props.aggregate == GroupAggregator.COUNT):
+        return dataStore.get_frequencies(column, output_type, binning=binning)
+    value_column = min(props.value_column, dataStore.column_count()) - 1
+    return dataStore.get_aggregates(column, value_column, props.aggregate, output_type, binning)
+
+
+# returns the indices of the columns get_chart_values() reads.
+def get_chart_columns(props):
+    columns = {props.column - 1}
+    if (props.aggregate != GroupAggregator.COUNT):
+        columns.add(props.value_column - 1)
+    return columns
+
 
 # ObjectVisualizer is a Visualizer which instantiates objects
 # based on frequency in a target data column.
@@ -260,139 +1433,164 @@ class ObjectVisualizer():
     material = None
     props = None
     
-    def visualize(self, dataStorage):
+    def visualize(self, dataStorage, parent=None):
+        if (parent is None):
+            parent = bpy.context.active_object
         self.dataStore = dataStorage
-        self.props = bpy.context.active_object.import_csv.visprops   
+        self.parent = parent
+        self.props = parent.import_csv.visprops
         self.bl_objects = self.create_blender_objects()
         if (self.props.use_animate):
             self.animate_objects()
 
         return self.bl_objects
 
+    # returns the indices of the columns the visualization reads.
+    def required_columns(self, props):
+        return get_chart_columns(props)
+
+    # computes the statistics create_blender_objects() reads, which are
+    # memoized on the DataStorage, see ImportJob.
+    def prepare(self, dataStorage, props):
+        column = min(props.column, dataStorage.column_count()) - 1
+        binning = Binning(props.split, props.bin_mode, props.bin_edges)
+        get_chart_values(dataStorage, props, column, 'COUNT' if props.use_counts else 'PERCENTAGE', binning)
+
     def create_blender_objects(self):
         headers = self.dataStore.headers
         objects = []
         split = self.props.split
-        data = self.dataStore.get_columns()
-        column = min(self.props.column, len(data)) -1
+        column = min(self.props.column, self.dataStore.column_count()) -1
         area = 1.0
-        cate_count, categories = self.dataStore.get_frequencies(column,'PERCENTAGE',split)
+        binning = Binning(split, self.props.bin_mode, self.props.bin_edges)
+        if (self.props.use_counts):
+            # one glyph per glyph_unit values instead of one per percent
+            cate_count, categories = get_chart_values(self.dataStore, self.props, column, 'COUNT', binning)
+            cate_count = [max(0, -(-c // self.props.glyph_unit)) for c in cate_count]
+        else:
+            cate_count, categories = get_chart_values(self.dataStore, self.props, column, 'PERCENTAGE', binning)
+            cate_count = [max(0, c) for c in cate_count]
         objects = []
         width = 5
         utils = Utils()
-        
+        builder = SceneBuilder(self.parent, 'object/')
+
         if self.props.point_object:
             user_object = bpy.data.objects[self.props.point_object]
             individual_offset = (user_object.dimensions.x / 3)
             offset = (user_object.dimensions.x / 2)
             self.material = user_object.active_material
         else:
-            bpy.ops.object.add(radius=0.1)
-            user_object = bpy.context.active_object
+            # a placeholder which is never linked to the scene itself
+            user_object = bpy.data.objects.new('glyph', None)
+            user_object.empty_display_size = 0.1
             individual_offset = 0.3
             offset = 0.5
             self.material = utils.create_shadeless_mat(id='ObjectVisualization')
 
-        scene = bpy.context.scene
+        # dimensions are evaluated once instead of for every glyph
+        dimensions = user_object.dimensions.copy()
+
+        # Create the glyphs
+        spacing = (dimensions.x + individual_offset, dimensions.y + individual_offset)
+        category_width = spacing[0] * width + offset
+        positions, glyph_categories, glyph_index = self.glyph_grid(cate_count, width, spacing, category_width)
+        if (self.props.use_instancing):
+            objects.append(self.create_instances(builder, user_object, positions, glyph_categories))
+        else:
+            for (k, (x, y)) in enumerate(positions.tolist()):
+                category = str(categories[glyph_categories[k]])
+                key = 'glyph/' + category + '/' + str(glyph_index[k])
+                objects.append(builder.add_linked_copy(user_object, user_object.name + category, (x, y, 0), key))
 
         abs_x = 0
         for i in range(len(categories)): # Iterate over each category
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.context.view_layer.objects.active = None
-            
-            # Create the objects
-            location_y = 0
-            for j in range(int(cate_count[i]),0,-width): # Creates the rows
-                location_x = 0 + abs_x
-                for k in range(width): # Creates the items in each row
-                    ob = user_object.copy()
-                    ob.data = user_object.data
-                    ob.animation_data_clear()
-                    scene.collection.objects.link(ob)
-                    ob.name = ob.name + str(categories[i])
-                    ob.location = (location_x, location_y, 0)
-                    location_x += ob.dimensions.x + individual_offset
-                    objects.append(ob)
-                location_y += user_object.dimensions.y + individual_offset
-                
             prev_abs_x = abs_x
-            abs_x += (user_object.dimensions.x + individual_offset) * width + offset
+            abs_x += category_width
                 
             # Create category labels
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.context.view_layer.objects.active = None
             cate_middle = (prev_abs_x + abs_x - 2*(offset + individual_offset)) / 2
-            bpy.ops.object.text_add(location=(cate_middle, -0.7, 0))
-            text = bpy.context.active_object
-            text.data.align_x = 'CENTER'
-            text.scale = (text.scale.x * 0.15,text.scale.y * 0.15, text.scale.z * 0.15)
-            text.name ="label" + str(categories[i])
-            text.data.body = categories[i]
-            text.active_material = self.material
-            
+            text = builder.add_text("label" + str(categories[i]), categories[i], (cate_middle, -0.7, 0), 0.15, self.material, key='label/' + str(categories[i]))
             objects.append(text)
 
         # Create visualization title
-        middle = (((user_object.dimensions.x + individual_offset) * width + offset) * len(categories)-1) / 2
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = None
-        bpy.ops.object.text_add(location=(middle, -1.1, 0))
-        text = bpy.context.active_object
-        text.data.align_x = 'CENTER'
-        text.scale = (text.dimensions.x * 0.30,text.dimensions.y * 0.30, text.dimensions.z * 0.30)
-        #bpy.ops.object.transform_apply(scale=True)
+        middle = (((dimensions.x + individual_offset) * width + offset) * len(categories)-1) / 2
         if (headers is not None):
-            text.name ="title" + str(headers[column])
-            text.data.body = headers[column]
+            text = builder.add_text("title" + str(headers[column]), headers[column], (middle, -1.1, 0), 0.30, self.material, key='title')
         else:
-            text.name ="title"
-            text.data.body = "Comparison"
-        text.active_material = self.material
+            text = builder.add_text("title", "Comparison", (middle, -1.1, 0), 0.30, self.material, key='title')
         objects.append(text)
+        builder.finish()
+        if not self.props.point_object:
+            bpy.data.objects.remove(user_object)
 
         utils.normalize_objects(objects, scale=10)    
 
         return objects
+
+    # glyph_grid lays out the glyphs of all categories in one step.
+    # Each category fills rows of width glyphs from the bottom up, next
+    # to the previous category. Returns an (n, 2) array of positions,
+    # the category of each glyph and its index within the category.
+    def glyph_grid(self, cate_count, width, spacing, category_width):
+        counts = numpy.array([int(c) for c in cate_count], dtype=numpy.int64)
+        glyph_categories = numpy.repeat(numpy.arange(len(counts)), counts)
+        starts = numpy.cumsum(counts) - counts
+        k = numpy.arange(len(glyph_categories)) - starts[glyph_categories]
+        positions = numpy.empty((len(k), 2))
+        positions[:,0] = glyph_categories * category_width + (k % width) * spacing[0]
+        positions[:,1] = (k // width) * spacing[1]
+        return (positions, glyph_categories, k)
+
+    # create_instances writes the glyph positions as vertices of a
+    # single mesh in bulk and instances the user object on them.
+    # The category of each glyph is stored as a point attribute.
+    def create_instances(self, builder, user_object, positions, glyph_categories):
+        co = numpy.zeros((len(positions), 3), dtype=numpy.float32)
+        co[:,:2] = positions
+        mesh = builder.get_mesh('glyphs', 'glyphs')
+        mesh.vertices.add(len(co))
+        mesh.vertices.foreach_set('co', co.ravel())
+        Utils().set_point_attribute(mesh, 'category', glyph_categories, 'INT')
+        mesh.update()
+
+        ob = builder.add_object('glyphs', mesh, key='glyphs')
+        ob.instance_type = 'VERTS'
+        instance = builder.add_linked_copy(user_object, user_object.name, key='glyphs/instance')
+        instance.parent = ob
+        return ob
         
     def animate_objects(self):
-        duration = self.props.duration
-        objects = self.bl_objects
-        
-        # calculated length of animation per object.
-        animate = duration
-        offset = float(duration) / float(len(objects))
-        
-        # Store the current frame so we can restore current frame state later.
-        startFrame = bpy.context.scene.frame_current
-        
-        current_offset = 0
-        # Iterate over each data point and animate it.
-        for (i, ob) in enumerate(objects):
-            bpy.context.scene.frame_current += animate
-            ob.keyframe_insert(data_path="scale", index=-1)
-
-            # Insert start keyframe
-            bpy.context.scene.frame_current -= animate
-            ob.scale = (0,0,0)
-            ob.keyframe_insert(data_path="scale", index=-1)
-            
-            # Offset the next object animation
-            current_offset += offset
-            if (current_offset > 1):
-                bpy.context.scene.frame_current += round(current_offset)
-                current_offset = 0
-
-        # Restore frame state    
-        bpy.context.scene.frame_current = startFrame
+        animate = self.props.duration
+        writer = KeyframeWriter()
+        starts = writer.stagger(len(self.bl_objects), animate, bpy.context.scene.frame_current)
+
+        # Grow each object from nothing to its size.
+        for (ob, start) in zip(self.bl_objects, starts):
+            writer.add(ob, "scale", (start, start + animate), ((0,0,0), tuple(ob.scale)))
         
     def draw(self, layout, context, props):
         box = layout.box()
         scene = context.scene
 
         box.prop_search(props, "point_object", scene, "objects",text="Object")
+        box.prop(props, 'use_instancing')
+        row = box.row(align=True)
+        row.prop(props, 'use_counts')
+        col = row.column(align=True)
+        col.prop(props, 'glyph_unit')
+        if (props.use_counts == False):
+            col.enabled = False
 
         box.prop(props, 'column')
-        box.prop(props, 'split')
+        box.prop(props, 'bin_mode')
+        if (props.bin_mode == 'CUSTOM'):
+            box.prop(props, 'bin_edges')
+        else:
+            box.prop(props, 'split')
+        box.prop(props, 'aggregate')
+        if (props.aggregate != 'COUNT'):
+            box.prop(props, 'value_column')
         box.prop(props, 'use_animate')
         if (props.use_animate):
             box.prop(props, 'duration')
@@ -407,54 +1605,54 @@ class HistogramVisualizer():
     material = None
     props = None
 
-    def visualize(self, dataStorage):
+    def visualize(self, dataStorage, parent=None):
+        if (parent is None):
+            parent = bpy.context.active_object
         self.dataStore = dataStorage
-        self.props = bpy.context.active_object.import_csv.visprops   
+        self.parent = parent
+        self.props = parent.import_csv.visprops
         self.bl_objects = self.create_blender_objects()
         if (self.props.use_animate):
             self.animate_objects()
 
         return self.bl_objects
 
+    # returns the indices of the columns the visualization reads.
+    def required_columns(self, props):
+        return get_chart_columns(props)
+
+    # computes the statistics create_blender_objects() reads, see ImportJob.
+    def prepare(self, dataStorage, props):
+        column = min(props.column, dataStorage.column_count()) - 1
+        binning = Binning(props.split, props.bin_mode, props.bin_edges)
+        get_chart_values(dataStorage, props, column, 'DECIMAL', binning)
+
     def create_blender_objects(self):
         headers = self.dataStore.headers
         objects = []
         split = self.props.split
-        data = self.dataStore.get_columns()
-        column = min(self.props.column, len(data)) -1
+        column = min(self.props.column, self.dataStore.column_count()) -1
         offset = 1
-        cate_count, categories = self.dataStore.get_frequencies(column,'DECIMAL',split)
+        binning = Binning(split, self.props.bin_mode, self.props.bin_edges)
+        cate_count, categories = get_chart_values(self.dataStore, self.props, column, 'DECIMAL', binning)
         objects = []
         utils = Utils()
         self.material = utils.create_shadeless_mat(id='HistogramVisualization'+str(column))
     
+        builder = SceneBuilder(self.parent, 'histogram/')
+
         # Create a block piece for each category
         # Create labels to put underneath each block
         location_x = 0
         for i in range(len(categories)):
-            # Create block
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.context.view_layer.objects.active = None
-            bpy.ops.mesh.primitive_plane_add(size=1.0, location=(0, 0, 0))
-            ob = bpy.context.active_object
-            ob.name ="block" + str(categories[i])
-            bpy.context.scene.cursor.location = (0,-0.5,0)
-            bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
-            ob.scale = (ob.scale.x * 0.35,ob.scale.y * cate_count[i], ob.scale.z)
-            bpy.ops.object.transform_apply(scale=True)
-            ob.location.x = location_x
-            ob.active_material = self.material
+            # Create block with its origin at the bottom edge
+            height = cate_count[i]
+            vertices = [(-0.175, 0, 0), (0.175, 0, 0), (0.175, height, 0), (-0.175, height, 0)]
+            ob = builder.add_mesh("block" + str(categories[i]), vertices, [(0, 1, 2, 3)],
+                                  location=(location_x, 0, 0), material=self.material, key='block/' + str(categories[i]))
             
             # Create labels
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.context.view_layer.objects.active = None
-            bpy.ops.object.text_add(location=(location_x, -0.7, 0))
-            text = bpy.context.active_object
-            text.data.align_x = 'CENTER'
-            text.scale = (text.scale.x * 0.15,text.scale.y * 0.15, text.scale.z * 0.15)
-            text.name ="label" + str(categories[i])
-            text.data.body = categories[i]
-            text.active_material = self.material
+            text = builder.add_text("label" + str(categories[i]), categories[i], (location_x, -0.7, 0), 0.15, self.material, key='label/' + str(categories[i]))
             
             objects.append(ob)
             objects.append(text)
@@ -463,67 +1661,39 @@ class HistogramVisualizer():
 
         # Create visualization title
         middle = (offset * len(categories)-1) / 2
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = None
-        bpy.ops.object.text_add(location=(middle, -1.1, 0))
-        text = bpy.context.active_object
-        text.data.align_x = 'CENTER'
-        text.scale = (text.scale.x * 0.30,text.scale.y * 0.30, text.scale.z * 0.30)
         if (headers is not None):
-            text.name ="title" + str(headers[column])
-            text.data.body = headers[column]
+            text = builder.add_text("title" + str(headers[column]), headers[column], (middle, -1.1, 0), 0.30, self.material, key='title')
         else:
-            text.name ="title"
-            text.data.body = "Histogram"
-        text.active_material = self.material
+            text = builder.add_text("title", "Histogram", (middle, -1.1, 0), 0.30, self.material, key='title')
         objects.append(text)
+        builder.finish()
 
         return objects
         
     def animate_objects(self):
-        duration = self.props.duration
-        objects = self.bl_objects
-        
-        # Specify an offset
-        offset = 1
-
-        # calculated length of animation per object.
-        animate = duration
-        offset = float(duration) / float(len(objects))
-        
-        # Store the current frame so we can restore current frame state later.
-        startFrame = bpy.context.scene.frame_current
-
-        current_offset = 0
-        # Iterate over each data point and animate it.
-        for (i, ob) in enumerate(objects):
-            bpy.context.scene.frame_current += animate
-            ob.keyframe_insert(data_path="scale", index=-1)
-
-            # Insert middle keyframe
-            bpy.context.scene.frame_current -= int(animate / 2)
-            ob.scale = (ob.scale.x,ob.scale.y*1.5,ob.scale.z)
-            ob.keyframe_insert(data_path="scale", index=-1)
-
-            # Insert start keyframe
-            bpy.context.scene.frame_current -= int(animate / 2)
-            ob.scale = (ob.scale.x,0,ob.scale.z)
-            ob.keyframe_insert(data_path="scale", index=-1)
-            
-            # Offset the next object animation
-            current_offset += offset
-            if (current_offset > 1):
-                bpy.context.scene.frame_current += round(current_offset)
-                current_offset = 0
-
-        # Restore frame state    
-        bpy.context.scene.frame_current = startFrame
+        animate = self.props.duration
+        half = int(animate / 2)
+        writer = KeyframeWriter()
+        starts = writer.stagger(len(self.bl_objects), animate, bpy.context.scene.frame_current)
+
+        # Grow each block from nothing, overshooting halfway.
+        for (ob, start) in zip(self.bl_objects, starts):
+            end = start + animate
+            (x, y, z) = ob.scale
+            writer.add(ob, "scale", (end - 2 * half, end - half, end), ((x,0,z), (x,y*1.5,z), (x,y,z)))
    
     def draw(self, layout, context, props):
         box = layout.box()
         
         box.prop(props, 'column')
-        box.prop(props, 'split')
+        box.prop(props, 'bin_mode')
+        if (props.bin_mode == 'CUSTOM'):
+            box.prop(props, 'bin_edges')
+        else:
+            box.prop(props, 'split')
+        box.prop(props, 'aggregate')
+        if (props.aggregate != 'COUNT'):
+            box.prop(props, 'value_column')
         box.prop(props, 'use_animate')
         if (props.use_animate):
             box.prop(props, 'duration')
@@ -539,153 +1709,132 @@ class PieVisualizer():
     material = None
     props = None
 
-    def visualize(self, dataStorage):
+    def visualize(self, dataStorage, parent=None):
+        if (parent is None):
+            parent = bpy.context.active_object
         self.dataStore = dataStorage
-        self.props = bpy.context.active_object.import_csv.visprops        
+        self.parent = parent
+        self.props = parent.import_csv.visprops
         self.bl_objects = self.create_blender_objects()
         if (self.props.use_animate):
             self.animate_objects()
 
         return self.bl_objects
 
-    def pie_cutout(self, circle, degrees):
-        mesh = circle.data
-        bm = bmesh.new()
-        bm.from_mesh(mesh)
-
-        for v in bm.verts:
-            # Loops through the vertices counter-clock wise.
-            # Loop until we hit a vertex with index higher than corresponding degree.
-            # TODO: Currently assuming index correspond to degrees here
-            if (v.index > degrees):
-                bm.verts.remove(v)
-
-        center_v = bm.verts.new()
-        bm.verts.index_update()
-        prev_v = None
-        loop_dur = center_v.index
-
-        for v in bm.verts:
-            if (prev_v and v.index < loop_dur):
-                bm.faces.new([prev_v, v, center_v])
-            prev_v = v
-        
-        bm.to_mesh(mesh)
-        bm.free()
+    # pie_mesh computes the arcs of all slices analytically and writes
+    # them into an empty mesh, with one material per slice. Each slice
+    # gets as many segments as its angle needs at the given resolution
+    # (segments per full circle), and at least one.
+    def pie_mesh(self, mesh, angles, materials, resolution):
+        step = 2 * pi / resolution
+        vertices = [(0.0, 0.0, 0.0)]
+        faces = []
+        material_indices = []
+        rotation = 0.0
+        for (i, angle) in enumerate(angles):
+            if (angle <= 0):
+                continue
+            segments = max(1, int(ceil(angle / step - 1e-9)))
+            arc = numpy.linspace(rotation, rotation + angle, segments + 1)
+            first = len(vertices)
+            vertices.extend(zip(numpy.cos(arc).tolist(), numpy.sin(arc).tolist(), [0.0] * len(arc)))
+            faces.extend((0, first + k, first + k + 1) for k in range(segments))
+            material_indices.extend([i] * segments)
+            rotation += angle
+
+        mesh.from_pydata(vertices, [], faces)
+        for material in materials:
+            mesh.materials.append(material)
+        mesh.polygons.foreach_set('material_index', material_indices)
+        mesh.update()
+        return mesh
 
     def set_text_labels(self, ob, label, min_rot, max_rot):
             ob.data.align_x = 'CENTER'
-            ob.scale = (ob.scale.x * 0.15,ob.scale.y * 0.15, ob.scale.z * 0.15)
+            ob.scale = (0.15, 0.15, 0.15)
             #bpy.ops.object.transform_apply(scale=True)
             ob.data.body = label
             ob.rotation_euler = (0,0, (min_rot + (max_rot / 2) ) )
             #bpy.ops.transform.translate(value=(0, 1.5, 0), constraint_axis=(False, True, False), constraint_orientation='LOCAL')
             ob.rotation_euler = (0,0,0)
 
+    # returns the indices of the columns the visualization reads.
+    def required_columns(self, props):
+        return get_chart_columns(props)
+
+    # computes the statistics create_blender_objects() reads, see ImportJob.
+    def prepare(self, dataStorage, props):
+        column = min(props.column, dataStorage.column_count()) - 1
+        binning = Binning(props.split, props.bin_mode, props.bin_edges)
+        get_chart_values(dataStorage, props, column, 'DEGREES', binning)
+
     def create_blender_objects(self):
         headers = self.dataStore.headers
         objects = []
         split = self.props.split
         color = self.props.color
-        data = self.dataStore.get_columns()
-        column = min(self.props.column, len(data)) -1
-        cate_count, categories = self.dataStore.get_frequencies(column,'DEGREES',split)
+        column = min(self.props.column, self.dataStore.column_count()) -1
+        binning = Binning(split, self.props.bin_mode, self.props.bin_edges)
+        cate_count, categories = get_chart_values(self.dataStore, self.props, column, 'DEGREES', binning)
         utils = Utils()
         self.material = utils.create_shadeless_mat(color,id='PieVisualization'+str(column))
         
+        builder = SceneBuilder(self.parent, 'pie/')
+
         # Create visualization title
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = None
-        bpy.ops.object.text_add(location=(0, 1.30, 0))
-        # file:///home/bastian/Sync/P8/Multi-media%20Programming/blender_python_reference_2_78a_release/bpy.types.BlendDataObjects.html?highlight=data%20objects%20new#bpy.types.BlendDataObjects.new
-        text = bpy.context.active_object
-        text.data.align_x = 'CENTER'
-        text.scale = (text.scale.x * 0.30,text.scale.y * 0.30, text.scale.z * 0.30)
         if (headers is not None):
-            text.name ="title" + str(headers[column])
-            text.data.body = headers[column]
+            text = builder.add_text("title" + str(headers[column]), headers[column], (0, 1.30, 0), 0.30, self.material, key='title')
         else:
-            text.name ="title"
-            text.data.body = "Pie Chart"
-        text.active_material = self.material
+            text = builder.add_text("title", "Pie Chart", (0, 1.30, 0), 0.30, self.material, key='title')
         objects.append(text)
         colors = []
         colors = utils.create_adjacent_colors(color, len(categories))        
-        # Create  pie pieces for each category
+        # Create one mesh holding a slice for each category
         # Create labels to put next to the pie pieces
+        materials = [utils.create_shadeless_mat(colors[i],id='Pie'+str(i)) for i in range(len(categories))]
+        angles = [radians(c) for c in cate_count]
+        name = "pie" + (str(headers[column]) if headers is not None else "")
+        mesh = self.pie_mesh(builder.get_mesh(name, 'pie'), angles, materials, self.props.resolution)
+        objects.append(builder.add_object(name, mesh, key='pie'))
+
         rotation = 0
         for i in range(len(categories)):
-            material = None
-            material = utils.create_shadeless_mat(colors[i],id='Pie'+str(i))
-            # Create pie chart
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.context.view_layer.objects.active = None
-            bpy.ops.mesh.primitive_circle_add(vertices=360, radius=1, fill_type='NOTHING', location=(0, 0, 0))
-            circle = bpy.context.active_object
-            circle.name ="pie" + str(categories[i])
-            self.pie_cutout(circle, cate_count[i])
-            circle.rotation_euler = (0,0, rotation)
-            circle.active_material = material
-
             # Create labels
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.context.view_layer.objects.active = None
-            bpy.ops.object.text_add(location=(0, 0, 0))
-            text = bpy.context.active_object
-            text.name ="label" + str(categories[i])
-            self.set_text_labels(text, categories[i], rotation, radians(cate_count[i]))
-            text.active_material = material
-            objects.append(circle)
+            text = builder.add_text("label" + str(categories[i]), categories[i], material=materials[i], key='label/' + str(categories[i]))
+            self.set_text_labels(text, categories[i], rotation, angles[i])
             objects.append(text)
 
-            rotation += radians(cate_count[i])
+            rotation += angles[i]
+        builder.finish()
 
         return objects
 
-    def animate_objects(self):         
-        duration = self.props.duration
-        objects = self.bl_objects
-        
-        # Specify an offset
-        offset = 1
-
-        # calculated length of animation per object.
-        animate = duration
-        offset = float(duration) / float(len(objects))
-        
-        # Store the current frame so we can restore current frame state later.
-        startFrame = bpy.context.scene.frame_current
-        
-        current_offset = 0
-        # Iterate over each data point and animate it.
-        for (i, ob) in enumerate(objects):            
-            bpy.context.scene.frame_current += animate
-            ob.keyframe_insert(data_path="rotation_euler", index=-1)
-            ob.keyframe_insert(data_path="scale", index=-1)
-
-            # Insert start keyframe
-            bpy.context.scene.frame_current -= animate
-            ob.rotation_euler = (0,0,radians(-360) + radians(-45) * i+1)
-            ob.scale = (0,0,0)
-            ob.keyframe_insert(data_path="rotation_euler", index=-1)
-            ob.keyframe_insert(data_path="scale", index=-1)
-            
-            # Offset the next object animation
-            current_offset += offset
-            if (current_offset > 1):
-                bpy.context.scene.frame_current += round(current_offset)
-                current_offset = 0
+    def animate_objects(self):
+        animate = self.props.duration
+        writer = KeyframeWriter()
+        starts = writer.stagger(len(self.bl_objects), animate, bpy.context.scene.frame_current)
 
-        # Restore frame state    
-        bpy.context.scene.frame_current = startFrame
+        # Spin each object in while growing it from nothing.
+        for (i, (ob, start)) in enumerate(zip(self.bl_objects, starts)):
+            frames = (start, start + animate)
+            writer.add(ob, "rotation_euler", frames, ((0,0,radians(-360) + radians(-45) * i+1), tuple(ob.rotation_euler)))
+            writer.add(ob, "scale", frames, ((0,0,0), tuple(ob.scale)))
 
 
     def draw(self, layout, context, props):
         box = layout.box()
         
         box.prop(props, 'column')
-        box.prop(props, 'split')
-        box.prop(props, 'color')        
+        box.prop(props, 'bin_mode')
+        if (props.bin_mode == 'CUSTOM'):
+            box.prop(props, 'bin_edges')
+        else:
+            box.prop(props, 'split')
+        box.prop(props, 'aggregate')
+        if (props.aggregate != 'COUNT'):
+            box.prop(props, 'value_column')
+        box.prop(props, 'color')
+        box.prop(props, 'resolution')
         box.prop(props, 'use_animate')
         if (props.use_animate):
             box.prop(props, 'duration')
@@ -701,9 +1850,12 @@ class ScatterVisualizer():
     material = None
     props = None
 
-    def visualize(self, dataStorage):
+    def visualize(self, dataStorage, parent=None):
+        if (parent is None):
+            parent = bpy.context.active_object
         self.dataStore = dataStorage
-        self.props = bpy.context.active_object.import_csv.visprops
+        self.parent = parent
+        self.props = parent.import_csv.visprops
         self.bl_objects = self.create_blender_objects()
             
         if (self.props.use_animate):
@@ -711,91 +1863,210 @@ class ScatterVisualizer():
         
         return self.bl_objects
 
+    # returns the indices of the columns mapped to an axis.
+    def required_columns(self, props):
+        axes = ((props.use_column, props.column), (props.use_column2, props.column2), (props.use_column3, props.column3))
+        return {column - 1 for (used, column) in axes if used}
+
+    # computes the points create_blender_objects() reads, which are
+    # memoized on the DataStorage, see ImportJob.
+    def prepare(self, dataStorage, props):
+        self.dataStore = dataStorage
+        self.props = props
+        if (props.use_lod):
+            self.sample_points()
+        if (not props.use_lod or (props.use_point_cloud and props.use_full_render)):
+            self.aggregate_points()
+
+    # the amount of rows a sampled data point represents
+    WEIGHT_KEY = 'csv_importer_weight'
+
     def create_blender_objects(self):
-        # Ensure no objects are selected in the scene before proceeding.
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = None
-        # Create dictionary to store the blender objects
+        if (self.props.use_lod):
+            positions, counts, rows = self.sample_points()
+        else:
+            positions, counts, rows = self.aggregate_points()
+        if (self.props.use_point_cloud):
+            return self.create_point_cloud(positions, counts, rows)
+
+        builder = SceneBuilder(self.parent, 'scatter/')
         objects = []
-        object_dict = {}
-        utils = Utils()
+        user_object = None
+        if self.props.point_object:
+            user_object = bpy.data.objects[self.props.point_object]
 
-        data = self.dataStore.get_columns('AS_NUMERIC')
-        columnX = min(self.props.column, len(data))-1
-        columnY = min(self.props.column2, len(data))-1
-        columnZ = min(self.props.column3, len(data))-1
-
-        # Iterate over the data and create blender objects for each datapoint.
-        # For now we assume the first three columns correspond to X Y Z
-        for i in range(len(data[0])):
-            x = data[columnX][i] if self.props.use_column else 0
-            y = data[columnY][i] if self.props.use_column2 else 0
-            z = data[columnZ][i] if self.props.use_column3 else 0 
-            
-            # if datapoint already exists, increase its scale
-            if x+y+z in object_dict:
-                object_dict[x+y+z].scale += Vector((0.5,0.5,0.5))
+        for (i, (x, y, z)) in enumerate(positions.tolist()):
+            # create either user_specified object or placeholder objects
+            if user_object:
+                ob = builder.add_linked_copy(user_object, "dataPoint" + str(rows[i]), (x, y, z), key='point/' + str(rows[i]))
             else:
-                # create either user_specified object or placeholder objects            
-                if self.props.point_object:
-                    bpy.ops.object.add_named(name=self.props.point_object,linked=True)
-                else:
-                    bpy.ops.object.add(radius=0.1)
+                ob = builder.add_empty("dataPoint" + str(rows[i]), 0.1, (x, y, z), key='point/' + str(rows[i]))
 
-                ob = bpy.context.active_object
-                ob.name="dataPoint" + str(i)
+            if (self.props.use_lod):
+                # a sampled point stands for weight rows without merging them
+                ob[self.WEIGHT_KEY] = counts[i]
+            else:
+                # if datapoint occurs more than once, increase its scale
+                ob.scale += Vector((0.5,0.5,0.5)) * (counts[i] - 1)
+                if (self.WEIGHT_KEY in ob):
+                    del ob[self.WEIGHT_KEY]
+            objects.append(ob)
+        builder.finish()
 
-                ob.location = (0,0,0)
+        return objects
 
-                if (self.props.use_column):
-                    ob.location.x = x
-                if (self.props.use_column2):        
-                    ob.location.y = y
-                if (self.props.use_column3):        
-                    ob.location.z = z
+    # create_point_cloud writes all data points as vertices of a single
+    # mesh in bulk. The amount of rows each point represents and its first
+    # row are stored as point attributes. A user object is shown on the
+    # points by instancing it on the vertices.
+    def create_point_cloud(self, positions, counts, rows):
+        utils = Utils()
+        builder = SceneBuilder(self.parent, 'scatter/')
+        mesh = builder.get_mesh('dataPoints', 'points')
+        mesh.vertices.add(len(positions))
+        mesh.vertices.foreach_set('co', numpy.asarray(positions, dtype=numpy.float32).ravel())
+        utils.set_point_attribute(mesh, 'count', counts, 'FLOAT')
+        utils.set_point_attribute(mesh, 'row', rows, 'INT')
+        mesh.update()
 
-                objects.append(ob)
-                object_dict[x+y+z] = ob
-        
-        return objects
+        ob = builder.add_object('dataPoints', mesh, key='points')
+        self.set_full_resolution(ob, self.props.use_lod and self.props.use_full_render)
 
-    def animate_objects(self):
-        duration = self.props.duration
-        
-        # calculated length of animation per object.
-        animate = duration
-        
-        objects = self.bl_objects
-        
-        # Specify an offset
-        offset = 1
+        if self.props.point_object:
+            user_object = bpy.data.objects[self.props.point_object]
+            instance = builder.add_linked_copy(user_object, user_object.name, key='points/instance')
+            instance.parent = ob
+            ob.instance_type = 'VERTS'
+        else:
+            ob.instance_type = 'NONE'
+        builder.finish()
+
+        return [ob]
+
+    # the mesh holding every data point is named in a custom property of
+    # the point cloud and kept by a fake user, since it has no other user.
+    # It is swapped in by the render handlers during renders, which may
+    # only change data while the interface is locked.
+    FULL_KEY = 'csv_importer_full'
+    LOD_KEY = 'csv_importer_lod'
+
+    def set_full_resolution(self, ob, enabled):
+        full = get_named_mesh(ob, self.FULL_KEY)
+        if (not enabled):
+            if (self.FULL_KEY in ob):
+                del ob[self.FULL_KEY]
+            if (full is not None):
+                bpy.data.meshes.remove(full)
+            return
 
-        # calculated length of animation per object.    
-        offset = float(duration) / float(len(objects))
-        
-        # Store the current frame so we can restore current frame state later.
-        startFrame = bpy.context.scene.frame_current
-        
-        current_offset = 0
-        # Iterate over each data point and animate it.
-        for (i, ob) in enumerate(objects):
-            # Insert end keyframe
-            bpy.context.scene.frame_current += animate
-            ob.keyframe_insert(data_path="location", index=-1)
-
-            # Insert start keyframe
-            bpy.context.scene.frame_current -= animate
-            ob.location = (ob.location.x,0,0)
-            ob.keyframe_insert(data_path="location", index=-1)
-            
-            # Offset the next object animation
-            current_offset += offset
-            if (current_offset > 1):
-                bpy.context.scene.frame_current += round(current_offset)
-                current_offset = 0
+        if (full is None):
+            full = bpy.data.meshes.new(ob.data.name + '.full')
+            full.use_fake_user = True
+        else:
+            full.clear_geometry()
+        positions, counts, rows = self.aggregate_points()
+        full.vertices.add(len(positions))
+        full.vertices.foreach_set('co', numpy.asarray(positions, dtype=numpy.float32).ravel())
+        utils = Utils()
+        utils.set_point_attribute(full, 'count', counts, 'FLOAT')
+        utils.set_point_attribute(full, 'row', rows, 'INT')
+        full.update()
+        ob[self.FULL_KEY] = full.name
+        bpy.context.scene.render.use_lock_interface = True
+
+    # aggregate_points collects the data points of the mapped columns
+    # chunk by chunk, merging points which share a cell of the spatial hash.
+    # Returns the positions, how many rows each point represents and
+    # the first row of each point. The spatial hash is memoized on the
+    # DataStorage and only the rows appended later are added to it,
+    # e.g. the lines read by a CSVFollower.
+    def aggregate_points(self):
+        dataStore = self.dataStore
+        axes = self.__axes()
+        cell_size = self.props.cell_size
+        # shared by every update, so categories keep their numbers
+        category_codes = {}
+
+        def compute():
+            spatial_hash = SpatialHash(cell_size)
+            first_row = 0
+            for chunk in dataStore.iter_chunks():
+                points = self.__points(chunk, axes, category_codes)
+                spatial_hash.add(points, first_row)
+                first_row += len(points)
+            return spatial_hash
+
+        # the hash is only read through get_points(), so it can grow in place
+        def update(spatial_hash, start):
+            spatial_hash.add(self.__points(dataStore, axes, category_codes, start), start)
+            return spatial_hash
+
+        spatial_hash = dataStore.memoize(('points', axes, cell_size), compute, update)
+        return spatial_hash.get_points()
+
+    # sample_points reduces the data points to the point budget
+    # in a streaming pass, see PointSampler. The sample is memoized
+    # on the DataStorage until rows are appended.
+    def sample_points(self):
+        sampler = PointSampler(self.props.point_budget, self.props.lod_method, self.props.cell_size)
+        key = ('sample', self.__axes(), sampler.budget, sampler.method, sampler.cell_size)
+        return self.dataStore.memoize(key, lambda: sampler.sample(self.iter_points))
+
+    # iter_points yields the data points of the mapped columns of each
+    # chunk as an (n, 3) array, together with the row of the first point.
+    def iter_points(self):
+        axes = self.__axes()
+
+        # Category tables shared by every chunk, so string values
+        # map to the same numeric representation throughout the file.
+        category_codes = {}
+
+        # Chunks are consumed one at a time, so only one chunk is in memory.
+        first_row = 0
+        for chunk in self.dataStore.iter_chunks():
+            points = self.__points(chunk, axes, category_codes)
+            yield (points, first_row)
+            first_row += len(points)
+
+    # returns the column mapped to each axis, or None for unused axes.
+    def __axes(self):
+        column_count = self.dataStore.column_count()
+        axes = ((self.props.use_column, self.props.column), (self.props.use_column2, self.props.column2),
+                (self.props.use_column3, self.props.column3))
+        return tuple(min(column, column_count) - 1 if used else None for (used, column) in axes)
+
+    # returns the rows of a chunk from index start as an (n, 3) array of points.
+    def __points(self, chunk, axes, category_codes, start=0):
+        points = numpy.zeros((chunk.row_count() - start, 3))
+        for (axis, column) in enumerate(axes):
+            if (column is not None):
+                points[:,axis] = self.__axis_values(chunk, column, category_codes, start)
+        return points
+
+    # returns the values of a column in a chunk as numbers, using the
+    # index of each category as numerical representation of strings.
+    def __axis_values(self, chunk, column, category_codes, start=0):
+        if (chunk.is_numeric(column)):
+            return chunk.numeric_view(column)[start:]
+        # translate the chunk's category codes to codes shared by all chunks
+        values = chunk.get_columns()[column]
+        codes = category_codes.setdefault(column, {})
+        lookup = numpy.array([codes.setdefault(c, len(codes)) for c in values.categories], dtype=numpy.float64)
+        return lookup[values.code_view()[start:]]
 
-        # Restore frame state    
-        bpy.context.scene.frame_current = startFrame
+    def animate_objects(self):
+        animate = self.props.duration
+        writer = KeyframeWriter()
+        starts = writer.stagger(len(self.bl_objects), animate, bpy.context.scene.frame_current)
+
+        # Move each data point up from the X axis. A point cloud is
+        # collapsed onto the X axis by its scale instead.
+        for (ob, start) in zip(self.bl_objects, starts):
+            frames = (start, start + animate)
+            if (self.props.use_point_cloud):
+                writer.add(ob, "scale", frames, ((ob.scale.x,0,0), tuple(ob.scale)))
+            else:
+                writer.add(ob, "location", frames, ((ob.location.x,0,0), tuple(ob.location)))
 
     def draw(self, layout, context, props):
         scene = context.scene
@@ -823,127 +2094,1030 @@ class ScatterVisualizer():
             col.enabled = False
 
         box.prop_search(props, "point_object", scene, "objects",text="Object")
+        box.prop(props, 'cell_size')
+        box.prop(props, 'use_point_cloud')
+        row = box.row(align=True)
+        row.prop(props, 'use_lod')
+        col = row.column(align=True)
+        col.prop(props, 'point_budget')
+        col.prop(props, 'lod_method', text="")
+        sub = col.column(align=True)
+        sub.prop(props, 'use_full_render')
+        if (props.use_lod == False):
+            col.enabled = False
+        if (props.use_point_cloud == False):
+            sub.enabled = False
         box.prop(props, 'use_animate')
         if (props.use_animate):
             box.prop(props, 'duration')
 
 
+# RowFilter selects rows with an expression over their fields, such as
+#   session == "A" and 0 <= value < 10
+# Columns are referred to by their header, or as c1, c2, ... by position.
+# Numeric columns compare as numbers and string columns as strings;
+# comparisons, in/not in with a list of constants, and/or/not and
+# arithmetic are supported. A comparison with a missing numeric cell is
+# unknown, which and/or/not keep unknown unless the other operand decides
+# (as in SQL), so a row never matches because of a missing cell.
+# The expression is compiled once into a function which filters a
+# whole chunk of rows with numpy, converting only the columns it uses.
+# Conditions evaluate to 1.0 (true), 0.0 (false) or NaN (unknown).
+class RowFilter():
+
+    COMPARISONS = {ast.Eq: operator.eq, ast.NotEq: operator.ne,
+                   ast.Lt: operator.lt, ast.LtE: operator.le,
+                   ast.Gt: operator.gt, ast.GtE: operator.ge,
+                   ast.In: lambda a, b: numpy.isin(a, b),
+                   ast.NotIn: lambda a, b: ~numpy.isin(a, b)}
+    ARITHMETIC = {ast.Add: operator.add, ast.Sub: operator.sub,
+                  ast.Mult: operator.mul, ast.Div: operator.truediv,
+                  ast.Mod: operator.mod}
+
+    # Python 3.7 (Blender 2.80 - 2.83) parses literals into these nodes
+    # rather than ast.Constant, with the value in the named attribute.
+    LEGACY_LITERALS = (((ast.Num, 'n'), (ast.Str, 's'), (ast.NameConstant, 'value'))
+                       if sys.version_info < (3, 8) else ())
+
+    BOOL = 'BOOL'
+    LIST = 'LIST'
+
+    expression = ''
+    # the indices of the columns the expression uses
+    columns = None
+
+    def __init__(self, expression, headers=None, types=None):
+        self.expression = expression
+        self.types = list(types or [])
+        self.names = {'c' + str(j + 1): j for j in range(len(self.types))}
+        for (j, header) in enumerate(headers or []):
+            self.names[header.strip()] = j
+        self.columns = set()
+        try:
+            tree = ast.parse(expression.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError('Invalid filter expression: {0}'.format(e.msg))
+        predicate, kind = self.__compile(tree.body)
+        if (kind != self.BOOL):
+            raise ValueError('The filter expression must be a condition')
+        self.__predicate = predicate
+
+    # returns a literal node as an ast.Constant, whichever Python parsed it.
+    def __literal(self, node):
+        for (kind, attribute) in self.LEGACY_LITERALS:
+            if (isinstance(node, kind)):
+                return ast.Constant(value=getattr(node, attribute))
+        return node
+
+    # returns the value of a constant of a list, folding a sign into numbers.
+    def __constant(self, node):
+        node = self.__literal(node)
+        if (isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd))):
+            value = self.__constant(node.operand)
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)):
+                return -value if isinstance(node.op, ast.USub) else value
+        elif (isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float, str))):
+            return node.value
+        raise ValueError('A list in a filter expression must hold constants of one type')
+
+    # compiles a node of the expression into a function of a column
+    # accessor, together with the kind of value the function returns.
+    def __compile(self, node):
+        node = self.__literal(node)
+        if (isinstance(node, ast.Name)):
+            j = self.names.get(node.id)
+            if (j is None):
+                raise ValueError('Unknown column in filter expression: {0}'.format(node.id))
+            self.columns.add(j)
+            return ((lambda column: column(j)), self.types[j])
+
+        if (isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float, str))):
+            value = node.value
+            if (isinstance(value, bool)):
+                kind = self.BOOL
+                value = float(value)
+            elif (isinstance(value, str)):
+                kind = DataStorage.STRING
+            else:
+                kind = DataStorage.NUMERIC
+            return ((lambda column: value), kind)
+
+        if (isinstance(node, (ast.Tuple, ast.List))):
+            values = [self.__constant(item) for item in node.elts]
+            kinds = {DataStorage.STRING if isinstance(v, str) else self.BOOL if isinstance(v, bool)
+                     else DataStorage.NUMERIC for v in values}
+            if (len(kinds) > 1):
+                raise ValueError('A list in a filter expression must hold constants of one type')
+            return ((lambda column: values), (self.LIST, kinds.pop() if kinds else None))
+
+        if (isinstance(node, ast.BoolOp)):
+            operands = [self.__operand(value, self.BOOL) for value in node.values]
+            combine = self.__and if isinstance(node.op, ast.And) else self.__or
+            def bool_op(column):
+                result = operands[0](column)
+                for operand in operands[1:]:
+                    result = combine(result, operand(column))
+                return result
+            return (bool_op, self.BOOL)
+
+        if (isinstance(node, ast.UnaryOp)):
+            if (isinstance(node.op, ast.Not)):
+                operand = self.__operand(node.operand, self.BOOL)
+                return ((lambda column: 1.0 - operand(column)), self.BOOL)
+            if (isinstance(node.op, (ast.USub, ast.UAdd))):
+                operand = self.__operand(node.operand, DataStorage.NUMERIC)
+                sign = -1 if isinstance(node.op, ast.USub) else 1
+                return ((lambda column: sign * operand(column)), DataStorage.NUMERIC)
+
+        if (isinstance(node, ast.BinOp) and type(node.op) in self.ARITHMETIC):
+            function = self.ARITHMETIC[type(node.op)]
+            left = self.__operand(node.left, DataStorage.NUMERIC)
+            right = self.__operand(node.right, DataStorage.NUMERIC)
+            return ((lambda column: function(left(column), right(column))), DataStorage.NUMERIC)
+
+        if (isinstance(node, ast.Compare) and all(type(op) in self.COMPARISONS for op in node.ops)):
+            operands = [self.__compile(node.left)] + [self.__compile(c) for c in node.comparators]
+            steps = []
+            for (op, (left, left_kind), (right, right_kind)) in zip(node.ops, operands[:-1], operands[1:]):
+                if (isinstance(op, (ast.In, ast.NotIn))):
+                    matches = isinstance(right_kind, tuple) and right_kind[1] in (left_kind, None)
+                else:
+                    matches = left_kind == right_kind and left_kind != self.BOOL
+                if (not matches):
+                    raise ValueError('Cannot compare {0} with {1} in filter expression'.format(
+                        self.__describe(left_kind), self.__describe(right_kind)))
+                steps.append((self.COMPARISONS[type(op)], left, right,
+                              left_kind == DataStorage.NUMERIC, right_kind == DataStorage.NUMERIC))
+            def compare(column):
+                result = 1.0
+                for (function, left, right, left_numeric, right_numeric) in steps:
+                    left_values = left(column)
+                    right_values = right(column)
+                    known = numpy.asarray(function(left_values, right_values), dtype=numpy.float64)
+                    # comparisons with missing numbers are unknown
+                    if (left_numeric):
+                        known = numpy.where(numpy.isnan(left_values), numpy.nan, known)
+                    if (right_numeric):
+                        known = numpy.where(numpy.isnan(right_values), numpy.nan, known)
+                    result = self.__and(result, known)
+                return result
+            return (compare, self.BOOL)
+
+        raise ValueError('Unsupported filter expression: {0}'.format(type(node).__name__))
+
+    # and/or of conditions: false and unknown is false, true or unknown is true.
+    def __and(self, a, b):
+        return numpy.where((a == 0.0) | (b == 0.0), 0.0, a * b)
+
+    def __or(self, a, b):
+        return numpy.where((a == 1.0) | (b == 1.0), 1.0, a + b)
+
+    def __operand(self, node, kind):
+        function, operand_kind = self.__compile(node)
+        if (operand_kind != kind):
+            raise ValueError('Expected a {0} in filter expression, not a {1}'.format(
+                self.__describe(kind), self.__describe(operand_kind)))
+        return function
+
+    def __describe(self, kind):
+        if (isinstance(kind, tuple)):
+            return 'list'
+        return {self.BOOL: 'condition', DataStorage.NUMERIC: 'number', DataStorage.STRING: 'string'}.get(kind, kind)
+
+    # returns a boolean array telling which of length rows match, where
+    # column(j) returns the values of column j of the rows as an array.
+    def mask(self, column, length):
+        result = numpy.asarray(self.__predicate(column)) == 1.0
+        return numpy.broadcast_to(result, (length,))
+
+    # returns the rows (lists of fields) which match.
+    def filter_rows(self, rows):
+        converted = {}
+        def column(j):
+            if (j not in converted):
+                values = [row[j] if j < len(row) else '' for row in rows]
+                if (self.types[j] == DataStorage.NUMERIC):
+                    converted[j] = self.__to_numbers(values)
+                else:
+                    converted[j] = numpy.array(values, dtype=object)
+            return converted[j]
+        return list(itertools.compress(rows, self.mask(column, len(rows))))
+
+    # returns the rows of an (n, width) array of numbers which match.
+    def filter_values(self, values):
+        return values[self.mask(lambda j: values[:,j], len(values))]
+
+    def __to_numbers(self, values):
+        try:
+            return numpy.array(values, dtype=numpy.float64)
+        except ValueError:
+            numbers = numpy.empty(len(values))
+            for (i, v) in enumerate(values):
+                try:
+                    numbers[i] = float(v)
+                except ValueError:
+                    numbers[i] = numpy.nan
+            return numbers
+
+
+# CSVFormat describes the dialect and schema of a CSV file
+# as detected by CSVReader.sniff(). It can be reused for
+# every later read of the same file.
+class CSVFormat():
+
+    delimiter = ','
+    quotechar = '"'
+    headers = None
+    types = None
+
+    def __init__(self, delimiter=',', quotechar='"', headers=None, types=None):
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.headers = headers
+        self.types = types
+
+    def to_json(self):
+        return json.dumps({'delimiter': self.delimiter, 'quotechar': self.quotechar,
+                           'headers': self.headers, 'types': self.types})
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(**json.loads(text))
+
+
 # CSVReader detects the format of CSV files and 
 # adds them to a DataStorage object.
 class CSVReader():
 
-    delimiter = ','
-    quotechar = ''
-    __headers = None
+    # amount of characters read from the head of the file for sniffing
+    sample_size = 65536
+    # amount of lines used to detect the delimiter, quotechar and headers
+    sniff_lines = 21
+
+    # files of at least this many bytes are parsed by a pool of processes
+    parallel_threshold = 32 * 1024 * 1024
+    # amount of byte ranges per process, so slower ranges balance out
+    ranges_per_process = 4
 
-    def __detect_delimiter(self, f):    
+    format = None
+
+    @property
+    def headers(self):
+        if (self.format is None):
+            return None
+        return self.format.headers
+
+    def __detect_delimiter(self, lines):
         commacount = 0
         semicommacount = 0
         tabcount = 0
-        f.seek(0)
-        for (i,line) in enumerate(f):
+        for line in lines:
             commacount += line.count(',')
             semicommacount += line.count(';')
             tabcount += line.count('\t')
-            if (i == 20):
-                break
-        
-        if (commacount > semicommacount and commacount > tabcount):
-            self.delimiter = ','
+
+        delimiter = ','
         if (semicommacount > commacount and semicommacount > tabcount):
-            self.delimiter = ';'
+            delimiter = ';'
         if (tabcount > commacount and tabcount > semicommacount):
-            self.delimiter = '\t'
+            delimiter = '\t'
+        return delimiter
 
-    def __detect_quotechar(self,f):
+    def __detect_quotechar(self, lines):
         quotecount = 0
         singlequotecount = 0
-        f.seek(0)
-        for (i,line) in enumerate(f):
+        for line in lines:
             quotecount += line.count('"')
             singlequotecount += line.count("'")
-            if (i == 20):
-                break
             
         if (singlequotecount > quotecount):
-            self.quotechar = "'"
-        else:
-            self.quotechar = '"'
+            return "'"
+        return '"'
 
-    def __detect_labels(self, f):
-        non_digits = 0        
+    def __detect_labels(self, rows):
+        if (not rows):
+            return None
+        utils = Utils()
 
-        f.seek(0)
-        reader = csv.reader(f, delimiter=self.delimiter, quotechar=self.quotechar)
-        dataStore = DataStorage()
-        
         # does the first line contain non-numerical data?
-        # if no, then there are no labels        
-        for (i, row) in enumerate(reader):
-            dataStore.add_row(row)
-            if (i == 20):
-                break
-        
-        data = dataStore.get_columns()
-        utils = Utils()
-        
-        for i in range(len(data)):
-            if (utils.is_number(data[i][0]) is False):
-                non_digits += 1
-                
+        # if no, then there are no labels
+        first = rows[0]
+        non_digits = sum(1 for v in first if not utils.is_number(v))
         if (non_digits == 0):
-            self.__headers = None
-            return
+            return None
 
-        # store each piece of non-numerical data of first line in an array.
         # check if _any_ of the next 20 lines contain data from first line
         # if they do, then there are no labels
         matches = 0
-        for (x,col) in enumerate(data):
-            for (y,val) in enumerate(col):
-                if (y == 0):
-                    continue
-                if (data[x][0] == val):
+        for row in rows[1:self.sniff_lines]:
+            for (x, val) in enumerate(row):
+                if (x < len(first) and first[x] == val):
                     matches += 1
 
-        # if there are more matches than the amount of rows
+        # if there are more matches than the amount of columns
         # assume that we are dealing with data.
-        if (matches > len(data)):
-            self.__headers = None
-            return
+        if (matches > len(first)):
+            return None
 
         # first row is non-numerical and unique, assume it's headers
-        headers = []
-        for (x,col) in enumerate(data):
-            headers.append(data[x][0])
-            
-        self.__headers = headers
-        return
+        return list(first)
+
+    # sniff reads a bounded sample from the head of the file once
+    # and detects delimiter, quote character, headers and column types.
+    # Returns the CSVFormat and the sample, so it can be parsed without
+    # reading it from the file again.
+    def sniff(self, f):
+        sample = f.read(self.sample_size)
+
+        # Only complete lines take part in the detection.
+        lines = sample.split('\n')
+        if (len(lines) > 1):
+            lines = lines[:-1]
+        head = lines[:self.sniff_lines]
+
+        delimiter = self.__detect_delimiter(head)
+        quotechar = self.__detect_quotechar(head)
+        rows = list(csv.reader(lines, delimiter=delimiter, quotechar=quotechar))
+        headers = self.__detect_labels(rows)
+        if (headers is not None):
+            rows = rows[1:]
+        types = Utils().infer_column_types(rows) if rows else None
+
+        self.format = CSVFormat(delimiter, quotechar, headers, types)
+        return (self.format, sample)
+
+    # returns the format of the file, sniffing it if necessary.
+    def read_format(self, filepath):
+        if (self.format is None):
+            f, raw = self.open_file(filepath)
+            with raw, f:
+                self.sniff(f)
+        return self.format
+
+    # magic bytes at the start of compressed files
+    compressions = ((b'\x1f\x8b', 'GZIP'),
+                    (b'BZh', 'BZ2'),
+                    (b'\xfd7zXZ\x00', 'XZ'),
+                    (b'\x28\xb5\x2f\xfd', 'ZSTD'))
+
+    # returns the compression of a file detected from its
+    # magic bytes, or None if the file is not compressed.
+    def compression(self, filepath):
+        with open(filepath, 'rb') as f:
+            return self.__detect_compression(f.read(6))
+
+    def __detect_compression(self, magic):
+        for (prefix, compression) in self.compressions:
+            if (magic.startswith(prefix)):
+                return compression
+        return None
 
-    def parse_csv(self, context, filepath):
-        f = open(filepath, 'r', encoding='utf-8')
-        self.__detect_delimiter(f)
-        self.__detect_quotechar(f)
-        self.__detect_labels(f)
-        
-        f.seek(0)
-        reader = csv.reader(f, delimiter=self.delimiter, quotechar=self.quotechar)
+    # opens a file for reading text, decompressing it while it is read
+    # if it is compressed. Returns the text stream and the underlying
+    # binary file, whose position tells how much of the file was read.
+    # Both have to be closed.
+    def open_file(self, filepath):
+        compression = self.compression(filepath)
+        if (compression == 'ZSTD' and zstandard is None):
+            raise ValueError('Reading zstd compressed files requires the zstandard module')
+
+        raw = open(filepath, 'rb')
+        if (compression == 'GZIP'):
+            stream = gzip.GzipFile(fileobj=raw, mode='rb')
+        elif (compression == 'BZ2'):
+            stream = bz2.BZ2File(raw)
+        elif (compression == 'XZ'):
+            stream = lzma.LZMAFile(raw)
+        elif (compression == 'ZSTD'):
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+        else:
+            stream = raw
+        return (io.TextIOWrapper(stream, encoding='utf-8', newline=''), raw)
+
+    # yields the lines of the sample followed by the rest of the file,
+    # completing the last line of the sample if it was cut off.
+    def __join_sample(self, sample, f):
+        lines = io.StringIO(sample, newline='').readlines()
+        if (lines and not lines[-1].endswith('\n')):
+            lines[-1] += f.readline()
+        yield from lines
+        yield from f
+
+    # read_chunks is a generator which yields the rows of the file
+    # in lists of at most chunk_size rows, skipping detected headers.
+    # The file is sniffed on the first read only.
+    # progress is called with the fraction of the file read after each chunk.
+    def read_chunks(self, filepath, chunk_size=10000, progress=None):
+        size = os.path.getsize(filepath) or 1
+        f, raw = self.open_file(filepath)
+        with raw, f:
+            lines = f
+            if (self.format is None):
+                csv_format, sample = self.sniff(f)
+                # Continue with the sample so it is not read twice.
+                lines = self.__join_sample(sample, f)
+            csv_format = self.format
+            reader = csv.reader(lines, delimiter=csv_format.delimiter, quotechar=csv_format.quotechar)
+
+            # If we have detected labels, skip the header
+            if (csv_format.headers is not None):
+                next(reader, None)
+
+            while True:
+                rows = list(itertools.islice(reader, chunk_size))
+                if (not rows):
+                    break
+                if (progress is not None):
+                    progress(min(raw.tell() / size, 1.0))
+                yield rows
+
+    # parse_csv reads the whole file into a DataStorage.
+    # If a DatasetCache is given, an unchanged file is loaded from it.
+    # parallel parses large files in a pool of processes.
+    # projection lists the columns to store, see DataStorage.
+    # Only rows matching filter_expression are stored, see RowFilter.
+    # progress is passed on to read_chunks().
+    def parse_csv(self, context, filepath, cache=None, progress=None, parallel=False, projection=None,
+                  filter_expression=''):
+        options = self.cache_options(projection, filter_expression)
+        if (cache is not None):
+            dataStore = cache.load(filepath, options)
+            if (dataStore is not None):
+                return dataStore
 
         # create data structure
-        dataStore = DataStorage()
-
-        # If we have detected labels, skip the header
-        if (self.__headers is not None):
-            dataStore.headers = self.__headers
-            reader.__next__()
+        dataStore = None
+        row_filter = self.get_row_filter(filepath, filter_expression)
+        # compressed files can only be read from the start
+        uncompressed = self.compression(filepath) is None
+        if (uncompressed and parallel and os.path.getsize(filepath) >= self.parallel_threshold):
+            dataStore = self.__parse_parallel(filepath, progress, projection, filter_expression)
+        if (uncompressed and dataStore is None and self.__is_numeric(filepath)):
+            dataStore = self.__parse_numeric(filepath, progress, projection, row_filter)
 
         # Read the CSV File and store data inside the columns data structure
-        for (i, row) in enumerate(reader):
-            dataStore.add_row(row)
+        if (dataStore is None):
+            for rows in self.read_chunks(filepath, progress=progress):
+                if (dataStore is None):
+                    dataStore = DataStorage(self.format.types, projection)
+                if (row_filter is not None):
+                    rows = row_filter.filter_rows(rows)
+                dataStore.add_rows(rows)
+        if (dataStore is None):
+            dataStore = DataStorage(projection=projection)
+        dataStore.headers = self.headers
+        if (cache is not None):
+            cache.store(filepath, dataStore, options)
+
+        # you can access the data using dataStore.get_columns()[x][y]
+        return dataStore
+
+    # __parse_parallel splits the file into byte ranges starting at
+    # records, parses them in forked processes into typed columns and
+    # appends the columns in the order of the ranges. Returns None if
+    # the file has to be parsed by a single process instead.
+    # Processes are only forked on Linux: on macOS forking a process
+    # which uses system frameworks can crash the child, and spawning
+    # would start a new Blender for every process.
+    def __parse_parallel(self, filepath, progress=None, projection=None, filter_expression=''):
+        processes = os.cpu_count() or 1
+        if (processes < 2 or not sys.platform.startswith('linux')):
+            return None
+        csv_format = self.read_format(filepath)
+        if (csv_format.types is None):
+            return None
+
+        with open(filepath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                bounds = self.__split_records(mm, processes * self.ranges_per_process)
+        if (bounds is None):
+            return None
+
+        dataStore = DataStorage(csv_format.types, projection)
+        tasks = [(filepath, start, end, csv_format.delimiter, csv_format.quotechar,
+                  csv_format.headers, csv_format.types, dataStore.projection, filter_expression,
+                  i == 0 and csv_format.headers is not None)
+                 for (i, (start, end)) in enumerate(zip(bounds[:-1], bounds[1:]))]
+        with multiprocessing.get_context('fork').Pool(processes) as pool:
+            for (end, columns) in zip(bounds[1:], pool.imap(parse_byte_range, tasks)):
+                dataStore.extend_columns(columns)
+                if (progress is not None):
+                    progress(end / bounds[-1])
+        return dataStore
 
-        # you can access the data using dataStore.get_rows()[x,y]
+    # whether every column of the file is numeric
+    def __is_numeric(self, filepath):
+        types = self.read_format(filepath).types
+        return bool(types) and all(t == DataStorage.NUMERIC for t in types)
+
+    # amount of bytes the numeric path parses at a time
+    numeric_block_size = 8 * 1024 * 1024
+
+    # __parse_numeric parses a file of numeric columns straight from a
+    # memory map into preallocated columns, see parse_numeric_block.
+    # Blocks which do not convert cleanly are parsed by the general path.
+    # Returns None if the file contains quotes, which may hide line breaks.
+    def __parse_numeric(self, filepath, progress=None, projection=None, row_filter=None):
+        csv_format = self.format
+        width = len(csv_format.types)
+        with open(filepath, 'rb') as f:
+            if (os.fstat(f.fileno()).st_size == 0):
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if (mm.find(csv_format.quotechar.encode('utf-8')) != -1):
+                    return None
+                size = len(mm)
+                start = 0
+                if (csv_format.headers is not None):
+                    start = mm.find(b'\n') + 1 or size
+
+                # every line is at most one row
+                capacity = 1 + sum(mm[offset:offset + self.numeric_block_size].count(b'\n')
+                                   for offset in range(start, size, self.numeric_block_size))
+                dataStore = DataStorage(csv_format.types, projection)
+                dataStore.headers = csv_format.headers
+                stored = [j for j in range(width) if dataStore.is_stored(j)]
+                # blocks parsed by the general path also need the filtered columns
+                block_projection = dataStore.projection
+                if (row_filter is not None and block_projection is not None):
+                    block_projection = sorted(set(block_projection) | row_filter.columns)
+                for j in stored:
+                    dataStore.columns[j] = array('d', [0.0]) * capacity
+                views = {j: numpy.frombuffer(dataStore.columns[j], dtype=numpy.float64) for j in stored}
+
+                filled = 0
+                position = start
+                while (position < size):
+                    end = mm.find(b'\n', min(position + self.numeric_block_size, size - 1)) + 1 or size
+                    block = mm[position:end]
+                    values = parse_numeric_block(block, csv_format.delimiter, width)
+                    if (values is None):
+                        values = self.__parse_block(block, csv_format, block_projection)
+                    if (row_filter is not None):
+                        values = row_filter.filter_values(values)
+                    for j in stored:
+                        views[j][filled:filled + len(values)] = values[:,j]
+                    filled += len(values)
+                    position = end
+                    if (progress is not None):
+                        progress(end / size)
+
+        # the views must be released before the columns can shrink
+        del views
+        for j in stored:
+            del dataStore.columns[j][filled:]
+        return dataStore
+
+    # parses a block of lines with csv.reader, returning an (n, width)
+    # array in which columns outside of the projection are NaN.
+    def __parse_block(self, block, csv_format, projection=None):
+        rows = csv.reader(io.StringIO(block.decode('utf-8'), newline=''),
+                          delimiter=csv_format.delimiter, quotechar=csv_format.quotechar)
+        chunk = DataStorage(csv_format.types, projection)
+        chunk.add_rows(list(rows))
+        values = numpy.full((chunk.row_count(), len(csv_format.types)), numpy.nan)
+        for j in range(len(csv_format.types)):
+            if (chunk.is_stored(j)):
+                values[:,j] = chunk.numeric_view(j)
+        return values
+
+    # amount of bytes searched for quote characters at a time
+    quote_block_size = 16 * 1024 * 1024
+
+    def __count_quotes(self, mm, quote, start, end):
+        count = 0
+        for offset in range(start, end, self.quote_block_size):
+            count += mm[offset:min(offset + self.quote_block_size, end)].count(quote)
+        return count
+
+    # returns the offsets of up to count + 1 byte ranges covering the file.
+    # A range starts after a line break outside of quotes, which is the
+    # case when an even amount of quote characters precedes it. Returns
+    # None when the quotes of the file do not pair up.
+    def __split_records(self, mm, count):
+        size = len(mm)
+        quote = self.format.quotechar.encode('utf-8')
+        has_quotes = mm.find(quote) != -1
+        if (has_quotes and self.__count_quotes(mm, quote, 0, size) % 2):
+            return None
+
+        bounds = [0]
+        quotes = 0
+        position = 0
+        for i in range(1, count):
+            target = size * i // count
+            if (target <= position):
+                continue
+            if (has_quotes):
+                quotes += self.__count_quotes(mm, quote, position, target)
+            position = target
+            while (True):
+                line_end = mm.find(b'\n', position)
+                if (line_end == -1):
+                    position = size
+                    break
+                if (has_quotes):
+                    quotes += self.__count_quotes(mm, quote, position, line_end + 1)
+                position = line_end + 1
+                if (quotes % 2 == 0):
+                    break
+            if (position >= size):
+                break
+            bounds.append(position)
+        bounds.append(size)
+        return bounds
+
+    # stream_csv returns a dataset which is read from the file in chunks
+    # of chunk_size rows whenever it is accessed.
+    def stream_csv(self, context, filepath, chunk_size=10000, projection=None, filter_expression=''):
+        return ChunkedDataStorage(self, filepath, chunk_size, projection, self.get_row_filter(filepath, filter_expression))
+
+    # the DatasetCache options of a parse, which differ
+    # for each projection and filter expression.
+    def cache_options(self, projection=None, filter_expression=''):
+        options = []
+        if (projection is not None):
+            options.append('columns=' + ','.join(str(j) for j in sorted(set(projection))))
+        if (filter_expression and filter_expression.strip()):
+            options.append('filter=' + filter_expression.strip())
+        return ';'.join(options)
+
+    # returns the RowFilter of an expression for the
+    # file, or None if there is no expression.
+    def get_row_filter(self, filepath, filter_expression):
+        if (not filter_expression or not filter_expression.strip()):
+            return None
+        csv_format = self.read_format(filepath)
+        return RowFilter(filter_expression, csv_format.headers, csv_format.types)
+
+    # read_appended parses the complete lines of the file after the
+    # byte offset, which must be the start of a line. Returns the rows and
+    # the offset after the last complete line, so a line which is still
+    # being written is read once it is complete. The format must be known.
+    def read_appended(self, filepath, offset):
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            block = f.read()
+        end = block.rfind(b'\n') + 1
+        if (end == 0):
+            return ([], offset)
+
+        text = io.StringIO(block[:end].decode('utf-8'), newline='')
+        rows = list(csv.reader(text, delimiter=self.format.delimiter, quotechar=self.format.quotechar))
+        return (rows, offset + end)
+
+
+# parse_numeric_block converts a block of lines of numeric cells into an
+# (n, width) array without creating a str per cell: line breaks are
+# turned into delimiters and numpy parses the whole block at once.
+# Returns None unless every line has width cells which all convert.
+def parse_numeric_block(block, delimiter, width):
+    if (not block.endswith(b'\n')):
+        block += b'\n'
+    separator = delimiter.encode('utf-8')
+    data = numpy.frombuffer(block, dtype=numpy.uint8)
+    line_ends = numpy.flatnonzero(data == ord('\n'))
+    cells = numpy.cumsum(data == ord(delimiter))[line_ends]
+    if (len(cells) == 0 or not (numpy.diff(cells, prepend=0) == width - 1).all()):
+        return None
+
+    with warnings.catch_warnings():
+        # numpy warns about cells which do not convert
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            values = numpy.fromstring(block[:-1].replace(b'\n', separator), dtype=numpy.float64, sep=delimiter)
+        except (ValueError, DeprecationWarning):
+            return None
+    if (len(values) != len(line_ends) * width):
+        return None
+    return values.reshape((len(line_ends), width))
+
+
+# parses the rows between two byte offsets of a file into typed columns,
+# see CSVReader.parse_csv. Runs in the worker processes of the parser.
+def parse_byte_range(task):
+    filepath, start, end, delimiter, quotechar, headers, types, projection, filter_expression, skip_header = task
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        block = f.read(end - start)
+    row_filter = None
+    if (filter_expression and filter_expression.strip()):
+        row_filter = RowFilter(filter_expression, headers, types)
+
+    if (all(t == DataStorage.NUMERIC for t in types)):
+        if (skip_header):
+            block = block[block.find(b'\n') + 1:]
+        values = parse_numeric_block(block, delimiter, len(types)) if quotechar.encode('utf-8') not in block else None
+        if (values is not None):
+            if (row_filter is not None):
+                values = row_filter.filter_values(values)
+            return [array('d', values[:,j].tobytes()) if projection is None or j in projection else None
+                    for j in range(len(types))]
+        skip_header = False
+
+    reader = csv.reader(io.StringIO(block.decode('utf-8'), newline=''), delimiter=delimiter, quotechar=quotechar)
+    if (skip_header):
+        next(reader, None)
+    rows = [row for row in reader if row]
+    if (row_filter is not None):
+        rows = row_filter.filter_rows(rows)
+    dataStore = DataStorage(types, projection)
+    dataStore.add_rows(rows)
+    return [c if c is None or types[j] == DataStorage.NUMERIC else (c.codes, c.categories)
+            for (j, c) in enumerate(dataStore.get_columns())]
+
+
+# CSVFollower keeps a DataStorage in sync with a file which is being
+# appended to. Every update parses only the complete lines written after
+# the byte offset of the previous update, so its cost depends on the
+# amount of new data instead of the size of the file. A file which
+# became smaller than the offset was replaced and is read again.
+class CSVFollower():
+
+    filepath = None
+    projection = None
+    filter_expression = ''
+    reader = None
+    dataStore = None
+    offset = 0
+
+    def __init__(self, filepath, csv_format=None, projection=None, filter_expression=''):
+        self.filepath = filepath
+        self.projection = projection
+        self.filter_expression = filter_expression
+        self.reader = CSVReader()
+        self.reader.format = csv_format
+        self.row_filter = None
+        self.dataStore = None
+        self.offset = 0
+
+    # reads the new lines of the file and
+    # returns the amount of rows which were added.
+    def update(self):
+        size = os.path.getsize(self.filepath)
+        if (size < self.offset):
+            self.reader.format = None
+            self.dataStore = None
+            self.offset = 0
+        if (size == self.offset or size == 0):
+            return 0
+
+        if (self.dataStore is None):
+            csv_format = self.reader.read_format(self.filepath)
+            self.row_filter = self.reader.get_row_filter(self.filepath, self.filter_expression)
+            self.dataStore = DataStorage(csv_format.types, self.projection)
+            self.dataStore.headers = csv_format.headers
+
+        start = self.offset
+        rows, self.offset = self.reader.read_appended(self.filepath, self.offset)
+        if (start == 0 and self.reader.headers is not None):
+            rows = rows[1:]
+        rows = [row for row in rows if row]
+        if (self.row_filter is not None):
+            rows = self.row_filter.filter_rows(rows)
+        self.dataStore.add_rows(rows)
+        return len(rows)
+
+# ImportCancelled is raised on the worker thread of an ImportJob
+# to stop reading once the import was cancelled.
+class ImportCancelled(Exception):
+    pass
+
+
+# PropertySnapshot copies the values of the properties of a PropertyGroup
+# into plain Python values, which can be read from a worker thread.
+class PropertySnapshot():
+
+    def __init__(self, group):
+        for prop in group.bl_rna.properties:
+            if (prop.identifier == 'rna_type' or prop.type in ('POINTER', 'COLLECTION')):
+                continue
+            value = getattr(group, prop.identifier)
+            if (getattr(prop, 'is_array', False)):
+                value = tuple(value)
+            setattr(self, prop.identifier, value)
+
+
+# ImportJob reads a file on a worker thread, so Blender stays responsive
+# while a large file is imported. The thread parses the file and computes
+# the statistics the visualizer reads with visualizer.prepare() from a
+# PropertySnapshot of its properties, which are memoized on the DataStorage;
+# objects are created on the main thread afterwards, since bpy must not be
+# used from other threads. Every pass over a streamed file reports its
+# progress and stops once the job is cancelled.
+class ImportJob():
+
+    filepath = None
+    # the stage the job is in and how much of it is done, from 0 to 1
+    stage = 'Reading'
+    progress = 0.0
+    dataStore = None
+    error = None
+
+    def __init__(self, filepath, streaming=False, chunk_size=10000, cache=None, parallel=False, projection=None,
+                 filter_expression='', visualizer=None, props=None):
+        self.filepath = filepath
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.parallel = parallel
+        self.projection = projection
+        self.filter_expression = filter_expression
+        self.visualizer = visualizer
+        self.props = props
+        self.__cancelled = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        self.__thread.start()
+
+    def cancel(self):
+        self.__cancelled.set()
+
+    def is_alive(self):
+        return self.__thread.is_alive()
+
+    def __report(self, progress):
+        if (self.__cancelled.is_set()):
+            raise ImportCancelled()
+        self.progress = progress
+
+    def __run(self):
+        try:
+            reader = CSVReader()
+            if (self.streaming):
+                dataStore = reader.stream_csv(None, self.filepath, self.chunk_size, self.projection,
+                                              self.filter_expression)
+            else:
+                dataStore = reader.parse_csv(None, self.filepath, self.cache, self.__report, self.parallel,
+                                             self.projection, self.filter_expression)
+
+            # Statistics are memoized, so the visualizer finds them computed.
+            self.stage = 'Summarizing'
+            self.__report(0.0)
+            if (self.visualizer is not None):
+                if (self.streaming):
+                    dataStore.progress = self.__report
+                try:
+                    self.visualizer.prepare(dataStore, self.props)
+                finally:
+                    if (self.streaming):
+                        dataStore.progress = None
+            self.__report(1.0)
+            self.dataStore = dataStore
+        except ImportCancelled:
+            pass
+        except Exception as e:
+            # reported on the main thread
+            self.error = e
+
+
+# DatasetCache keeps parsed datasets in a compact binary sidecar format,
+# so an unchanged file can be loaded without parsing any text.
+# Entries are keyed by the file path, size, mtime and a hash of the head
+# and tail of the file, and evicted least recently used first once the
+# cache grows beyond size_limit bytes.
+#
+# An entry is a header line, the length of a JSON description of the
+# dataset and the description itself, followed by the raw buffers of
+# each column (array('d') values or array('i') category codes).
+class DatasetCache():
+
+    MAGIC = b'CSVCACHE2\n'
+    extension = '.csvcache'
+    # amount of bytes hashed at the head and the tail of the file
+    hash_size = 65536
+
+    directory = None
+    size_limit = 1024 * 1024 * 1024
+
+    def __init__(self, directory=None, size_limit=None):
+        if (not directory):
+            directory = os.path.join(tempfile.gettempdir(), 'blender_csv_importer_cache')
+        self.directory = directory
+        if (size_limit is not None):
+            self.size_limit = size_limit
+
+    def __entry_path(self, filepath, options):
+        name = hashlib.sha1((os.path.abspath(filepath) + '|' + options).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + self.extension)
+
+    def __source_key(self, filepath):
+        st = os.stat(filepath)
+        digest = hashlib.sha1()
+        with open(filepath, 'rb') as f:
+            digest.update(f.read(self.hash_size))
+            if (st.st_size > self.hash_size):
+                f.seek(max(self.hash_size, st.st_size - self.hash_size))
+                digest.update(f.read(self.hash_size))
+        return {'path': os.path.abspath(filepath), 'size': st.st_size,
+                'mtime': st.st_mtime_ns, 'hash': digest.hexdigest()}
+
+    # returns the cached DataStorage of a file or None if there is
+    # no valid entry. options distinguishes differently parsed entries.
+    def load(self, filepath, options=''):
+        entry = self.__entry_path(filepath, options)
+        if (not os.path.exists(entry)):
+            return None
+        try:
+            with open(entry, 'rb') as f:
+                if (f.readline() != self.MAGIC):
+                    return None
+                length = int.from_bytes(f.read(8), 'little')
+                meta = json.loads(f.read(length).decode('utf-8'))
+                if (meta['byteorder'] != sys.byteorder or meta['source'] != self.__source_key(filepath)):
+                    return None
+
+                dataStore = DataStorage(meta['types'], meta['projection'])
+                dataStore.headers = meta['headers']
+                rows = meta['rows']
+                for (j, column) in enumerate(dataStore.columns):
+                    if (column is None):
+                        continue
+                    if (meta['types'][j] == DataStorage.NUMERIC):
+                        column.fromfile(f, rows)
+                    else:
+                        column.set_categories(meta['categories'][j])
+                        column.codes.fromfile(f, rows)
+        except (OSError, EOFError, ValueError, KeyError):
+            return None
+
+        # mark the entry as recently used
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
         return dataStore
 
+    # stores a parsed DataStorage. The cache is only an optimization, so
+    # an entry which cannot be written (e.g. to an unwritable or invalid
+    # directory) is skipped and the import goes on with the parsed data.
+    def store(self, filepath, dataStore, options=''):
+        dataStore.flush()
+        if (dataStore.columns is None):
+            return
+        meta = {
+            'byteorder': sys.byteorder,
+            'source': self.__source_key(filepath),
+            'headers': dataStore.headers,
+            'types': dataStore.types,
+            'projection': dataStore.projection,
+            'rows': dataStore.row_count(),
+            'categories': [None if t == DataStorage.NUMERIC or c is None else c.categories
+                           for (t, c) in zip(dataStore.types, dataStore.columns)],
+        }
+        meta = json.dumps(meta).encode('utf-8')
+
+        entry = self.__entry_path(filepath, options)
+        partial = entry + '.part'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(partial, 'wb') as f:
+                f.write(self.MAGIC)
+                f.write(len(meta).to_bytes(8, 'little'))
+                f.write(meta)
+                for (j, column) in enumerate(dataStore.columns):
+                    if (column is None):
+                        continue
+                    if (dataStore.types[j] == DataStorage.NUMERIC):
+                        column.tofile(f)
+                    else:
+                        column.codes.tofile(f)
+            os.replace(partial, entry)
+        except OSError:
+            if (os.path.exists(partial)):
+                try:
+                    os.remove(partial)
+                except OSError:
+                    pass
+            return
+        self.evict()
+
+    # removes least recently used entries until the cache fits size_limit.
+    # Entries which cannot be removed, e.g. while another process reads
+    # them, are left behind until the next eviction.
+    def evict(self):
+        if (not os.path.isdir(self.directory)):
+            return
+        entries = []
+        try:
+            for name in os.listdir(self.directory):
+                if (name.endswith(self.extension)):
+                    st = os.stat(os.path.join(self.directory, name))
+                    entries.append((st.st_mtime, st.st_size, name))
+        except OSError:
+            return
+        total = sum(e[1] for e in entries)
+        for (mtime, size, name) in sorted(entries):
+            if (total <= self.size_limit):
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+
 # VisualizationProperties is a PropertyGroup which
 # stores UI options in the bpy structure so they
 # can be drawn by the different visualizers.
@@ -960,6 +3134,66 @@ class VisualizationProperties(PropertyGroup):
             description="Choose an object to represent each data point (Optional).",
             )
             
+    use_point_cloud = BoolProperty(
+            name="Point Cloud",
+            description="Create the data points as vertices of a single mesh, instancing the object on them",
+            default=False,
+            )
+
+    cell_size = FloatProperty(
+            name="Merge Distance",
+            description="Data points closer than this are merged into one larger point (0 merges identical points only)",
+            min=0.0,
+            default=0.0,
+            )
+
+    use_lod = BoolProperty(
+            name="Point Budget",
+            description="Reduce the data points to a budget while streaming the file, weighting each point by the points it represents",
+            default=False,
+            )
+
+    point_budget = IntProperty(
+            name="Points",
+            description="Maximum amount of data points shown",
+            min=8,
+            default=100000,
+            )
+
+    lod_method = EnumProperty(
+            name="Method",
+            description="How the data points are reduced to the budget",
+            items=(('RESERVOIR', "Random", "Keep a uniform random sample of the data points"),
+                   ('STRATIFIED', "Stratified", "Sample every region in proportion to its amount of data points"),
+                   ('VOXEL', "Voxel Grid", "Merge the data points of a grid, coarsened until it fits the budget")),
+            default='RESERVOIR',
+            )
+
+    use_full_render = BoolProperty(
+            name="Full Render",
+            description="Render every data point of the point cloud, while the viewport shows the budget",
+            default=False,
+            )
+
+    use_instancing = BoolProperty(
+            name="Instance",
+            description="Write the glyph positions into a single mesh and instance the object on them",
+            default=False,
+            )
+
+    use_counts = BoolProperty(
+            name="Counts",
+            description="Show one object per Unit values instead of one object per percent",
+            default=False,
+            )
+
+    glyph_unit = IntProperty(
+            name="Unit",
+            description="Amount of values represented by each object",
+            min=1,
+            default=1,
+            )
+
     use_animate = BoolProperty(
             name="Animate",
             description="Animate the data",
@@ -1012,6 +3246,47 @@ class VisualizationProperties(PropertyGroup):
         default=3,
         )
         
+    bin_mode = EnumProperty(
+            name="Bins",
+            description="How numeric data is split into categories",
+            items=(('EQUAL', "Equal Width", "Split the value range into bins of equal width"),
+                   ('QUANTILE', "Quantiles", "Split the data into bins holding equal amounts of values"),
+                   ('CUSTOM', "Custom", "Use custom bin edges")),
+            default='EQUAL',
+            )
+
+    bin_edges = StringProperty(
+            name="Edges",
+            description="Comma-separated bin edges, e.g. 0, 10, 50, 100",
+            default="",
+            )
+
+    aggregate = EnumProperty(
+            name="Values",
+            description="What is charted for each category",
+            items=(('COUNT', "Count", "The amount of rows in each category"),
+                   ('SUM', "Sum", "The sum of the value column in each category"),
+                   ('MEAN', "Mean", "The mean of the value column in each category"),
+                   ('MIN', "Minimum", "The minimum of the value column in each category"),
+                   ('MAX', "Maximum", "The maximum of the value column in each category"),
+                   ('STDDEV', "Standard Deviation", "The standard deviation of the value column in each category")),
+            default='COUNT',
+            )
+
+    value_column = IntProperty(
+        name="Value Column",
+        description="Choose which column of data in the .csv to aggregate",
+        min=1,
+        default=2,
+        )
+
+    resolution = IntProperty(
+        name="Resolution",
+        description="Amount of segments a full circle is made of",
+        min=8,
+        default=128,
+        )
+
     color = FloatVectorProperty(name="Color", 
                                 subtype='COLOR', 
                                 default=[0.35,0.49,0.78])      
@@ -1066,6 +3341,57 @@ class ImportCSVProperties(PropertyGroup):
             update=update_filepath
             )            
             
+    use_streaming = bpy.props.BoolProperty(
+            name="Stream",
+            description="Read the file in chunks instead of loading it into memory at once",
+            default=False,
+            )
+
+    chunk_size = bpy.props.IntProperty(
+            name="Chunk Size",
+            description="Amount of rows read at a time when streaming",
+            min=100,
+            default=10000,
+            )
+
+    filter_expression = bpy.props.StringProperty(
+            name="Filter",
+            description="Only import rows matching a condition on the columns, "
+                        "e.g. c3 > 0.5 and c1 in ('a', 'b'). Columns are named by header or c1, c2, ...",
+            default="",
+            )
+
+    def update_follow (other, context):
+        if (other.use_follow and not bpy.app.timers.is_registered(follow_files)):
+            bpy.app.timers.register(follow_files, first_interval=other.follow_interval, persistent=True)
+
+    use_follow = bpy.props.BoolProperty(
+            name="Follow",
+            description="Keep reading lines appended to the file and update the visualization",
+            default=False,
+            update=update_follow
+            )
+
+    follow_interval = bpy.props.FloatProperty(
+            name="Interval",
+            description="Seconds between reads of the followed file",
+            min=0.1,
+            default=1.0,
+            )
+
+    # the byte offset after the last line read while following. It is
+    # kept as a string, since files may be larger than an IntProperty.
+    follow_offset = bpy.props.StringProperty(
+            default="0",
+            options={'HIDDEN'},
+            )
+
+    # the CSVFormat of the followed file as JSON
+    follow_format = bpy.props.StringProperty(
+            default="",
+            options={'HIDDEN'},
+            )
+
     visualizers = [ScatterVisualizer(), PieVisualizer(), HistogramVisualizer(), ObjectVisualizer()]
     vis_index = bpy.props.IntProperty()
 
@@ -1081,34 +3407,27 @@ class ImportCSV(Operator, ImportHelper):
     bl_label = "Import Statistical Data"
 
     # ImportHelper mixin class uses this
-    filename_ext = {".csv", ".tsv"}
+    filename_ext = {".csv", ".tsv", ".gz", ".bz2", ".xz", ".zst"}
 
     filter_glob = StringProperty(
-            default="*.csv;*.tsv",
+            default="*.csv;*.tsv;*.csv.gz;*.tsv.gz;*.csv.bz2;*.tsv.bz2;*.csv.xz;*.tsv.xz;*.csv.zst;*.tsv.zst",
             options={'HIDDEN'},
             )
             
     _parent = None
 
 
+    _job = None
+    _timer = None
+    # the get_dataset_key() of the file read by _job
+    _dataset_key = None
+
     def execute(self, context):
-        w = context.window
-        w.cursor_set('WAIT')
-        
         if not self._parent:
             self._parent = bpy.context.active_object
-
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = None
-        
-        if self._parent.children:
-            print("delete the children!")
-            for child in self._parent.children:
-                child.select_set(state=True)    
-            bpy.ops.object.delete()
-            
-        self._parent.select_set(state=True)
-        bpy.context.view_layer.objects.active = self._parent
+        if not self._parent:
+            self.report({'ERROR'}, 'Select a visualization to import into')
+            return {'CANCELLED'}
 
         filepath = None
         if self.filepath:
@@ -1116,22 +3435,112 @@ class ImportCSV(Operator, ImportHelper):
             self._parent.import_csv.filepath = filepath
         elif self._parent.import_csv.filepath:
             filepath = self._parent.import_csv.filepath
-        
+
+        # Files are read in the background when there is a window to
+        # report the progress in. Followed files are read incrementally.
+        follow = bool(filepath) and self._parent.import_csv.use_follow and can_follow(filepath)
+        # A refresh of an unchanged file reuses its DataStorage, see datasets.
+        dataStore = None
+        if (filepath and not follow):
+            dataStore = get_dataset(self._parent, filepath)
+        if (filepath and context.window and not follow and dataStore is None):
+            return self.start_job(context, filepath)
+
+        w = context.window
+        if w:
+            w.cursor_set('WAIT')
+
         if filepath:
             reader = CSVReader()
-            dataStore = reader.parse_csv(context, filepath)
-            vis_index = self._parent.import_csv.vis_index
-            visualizer = self._parent.import_csv.visualizers[vis_index]
+            props = self._parent.import_csv
+            try:
+                if (follow):
+                    dataStore = get_follower(self._parent, reset=True).dataStore
+                elif (dataStore is None):
+                    key = get_dataset_key(self._parent, filepath)
+                    if (get_streaming(self._parent)):
+                        dataStore = reader.stream_csv(context, filepath, props.chunk_size, get_projection(self._parent),
+                                                      props.filter_expression)
+                    else:
+                        dataStore = reader.parse_csv(context, filepath, get_dataset_cache(),
+                                                     parallel=use_parallel_parsing(),
+                                                     projection=get_projection(self._parent),
+                                                     filter_expression=props.filter_expression)
+                    keep_dataset(self._parent, key, dataStore)
+                build_visualization(self._parent, dataStore or DataStorage())
+            except ValueError as e:
+                self.report({'ERROR'}, str(e))
+                if w:
+                    w.cursor_set('DEFAULT')
+                return {'CANCELLED'}
+        elif self._parent.children:
+            SceneBuilder().remove_objects(self._parent.children)
+            MaterialPool().collect()
+
+        bpy.context.view_layer.objects.active = self._parent
+        self._parent.select_set(state=True)
+        if w:
+            w.cursor_set('DEFAULT')
+        return {'FINISHED'}
 
-            visualization = visualizer.visualize(dataStore)
-            for i in range(len(visualization)):
-                visualization[i].parent = self._parent
-                visualization[i].matrix_parent_inverse = self._parent.matrix_world.inverted()
+    # start_job reads the file on a worker thread and
+    # builds the visualization from modal() once it is read.
+    def start_job(self, context, filepath):
+        props = self._parent.import_csv
+        streaming = get_streaming(self._parent)
+        cache = None if streaming else get_dataset_cache()
+        self._dataset_key = get_dataset_key(self._parent, filepath)
+        # the worker prepares a visualizer of its own from plain values
+        visualizer = type(props.visualizers[props.vis_index])()
+        self._job = ImportJob(filepath, streaming, props.chunk_size, cache, use_parallel_parsing(),
+                              get_projection(self._parent), props.filter_expression,
+                              visualizer, PropertySnapshot(props.visprops))
+        self._job.start()
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        job = self._job
+        if (event.type == 'ESC'):
+            job.cancel()
+            self.end_job(context)
+            self.report({'WARNING'}, 'Import cancelled')
+            return {'CANCELLED'}
+
+        if (event.type != 'TIMER'):
+            return {'PASS_THROUGH'}
+
+        if (job.is_alive()):
+            context.window_manager.progress_update(int(job.progress * 100))
+            context.workspace.status_text_set('Importing {0}: {1} {2}% (Esc to cancel)'.format(
+                os.path.basename(job.filepath), job.stage, int(job.progress * 100)))
+            return {'RUNNING_MODAL'}
+
+        self.end_job(context)
+        if (job.error is not None):
+            self.report({'ERROR'}, str(job.error))
+            return {'CANCELLED'}
+
+        keep_dataset(self._parent, self._dataset_key, job.dataStore)
+        try:
+            build_visualization(self._parent, job.dataStore)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
 
         bpy.context.view_layer.objects.active = self._parent
         self._parent.select_set(state=True)
-        w.cursor_set('DEFAULT')        
         return {'FINISHED'}
+
+    def end_job(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
     
     def invoke(self, context, event):
         # Create Parent Empty
@@ -1154,10 +3563,440 @@ class ImportCSV(Operator, ImportHelper):
 
         box = layout.box()
         box.prop(props, 'type')
+        box.prop(props, 'filter_expression')
+        row = box.row(align=True)
+        row.prop(props, 'use_streaming')
+        col = row.column(align=True)
+        col.prop(props, 'chunk_size')
+        if (props.use_streaming == False):
+            col.enabled = False
+        row = box.row(align=True)
+        row.prop(props, 'use_follow')
+        col = row.column(align=True)
+        col.prop(props, 'follow_interval')
+        if (props.use_follow == False):
+            col.enabled = False
         if (props.visualizers):
             props.visualizers[props.vis_index].draw(layout, context, props.visprops)
 
 
+# builds the visualization chosen in the properties of parent
+# from dataStore, reusing the objects of a previous build.
+def build_visualization(parent, dataStore):
+    props = parent.import_csv
+    visualizer = props.visualizers[props.vis_index]
+    visualization = visualizer.visualize(dataStore, parent)
+
+    parent_inverse = parent.matrix_world.inverted()
+    for ob in visualization:
+        ob.parent = parent
+        ob.matrix_parent_inverse = parent_inverse
+
+    # materials of removed objects are no longer needed
+    MaterialPool().collect()
+    return visualization
+
+
+# returns the indices of the columns the visualization of parent uses.
+def get_projection(parent):
+    props = parent.import_csv
+    return sorted(props.visualizers[props.vis_index].required_columns(props.visprops))
+
+
+# returns whether the file of parent is streamed. A point budget
+# samples the data points from a stream, so they are never all in memory.
+def get_streaming(parent):
+    props = parent.import_csv
+    visualizer = props.visualizers[props.vis_index]
+    return props.use_streaming or (isinstance(visualizer, ScatterVisualizer) and props.visprops.use_lod)
+
+
+# The DataStorage each visualization was last built from, by the name of
+# the visualization parent, as (get_dataset_key(), DataStorage). Building
+# a visualization again from an unchanged file reuses its DataStorage, so
+# its memoized statistics are kept, e.g. the bins of an earlier Subdivision.
+datasets = {}
+
+
+# returns what identifies the DataStorage read for parent from a file:
+# the identity of the file and the options it is read with, or None if
+# the file does not exist.
+def get_dataset_key(parent, filepath):
+    filepath = bpy.path.abspath(filepath)
+    if (not os.path.isfile(filepath)):
+        return None
+    props = parent.import_csv
+    st = os.stat(filepath)
+    return (os.path.abspath(filepath), st.st_size, st.st_mtime_ns, tuple(get_projection(parent)),
+            props.filter_expression, get_streaming(parent), props.chunk_size)
+
+
+# returns the kept DataStorage of parent if it was read from
+# the file as it is now with the current options, else None.
+def get_dataset(parent, filepath):
+    entry = datasets.get(parent.name)
+    key = get_dataset_key(parent, filepath)
+    if (entry is None or key is None or entry[0] != key):
+        return None
+    return entry[1]
+
+
+def keep_dataset(parent, key, dataStore):
+    if (key is None or dataStore is None):
+        datasets.pop(parent.name, None)
+        return
+    datasets[parent.name] = (key, dataStore)
+
+
+# CSVFollowers of the visualizations following their file,
+# by the name of the visualization parent.
+followers = {}
+
+
+# returns the CSVFollower of parent after reading the new lines of its file.
+# A visualization without a follower (e.g. after loading a .blend file)
+# reads its file again, reusing the format stored in its properties.
+# reset reads the file again and detects its format.
+def get_follower(parent, reset=False):
+    props = parent.import_csv
+    filepath = bpy.path.abspath(props.filepath)
+    projection = get_projection(parent)
+    follower = followers.get(parent.name)
+    if (follower is not None and (follower.projection != projection
+                                  or follower.filter_expression != props.filter_expression)):
+        # the visualization uses other columns or rows now
+        reset = True
+    if (reset or follower is None or follower.filepath != filepath):
+        csv_format = None
+        if (not reset and follower is None and props.follow_format
+                and os.path.getsize(filepath) >= int(props.follow_offset)):
+            csv_format = CSVFormat.from_json(props.follow_format)
+        follower = CSVFollower(filepath, csv_format, projection, props.filter_expression)
+        followers[parent.name] = follower
+
+    follower.update()
+    props.follow_offset = str(follower.offset)
+    if (follower.reader.format is not None):
+        props.follow_format = follower.reader.format.to_json()
+    return follower
+
+
+# returns whether a file can be followed, which compressed files cannot.
+def can_follow(filepath):
+    filepath = bpy.path.abspath(filepath)
+    return os.path.isfile(filepath) and CSVReader().compression(filepath) is None
+
+
+# follow_files is a timer which updates every visualization following
+# its file with the lines appended since the previous call. Returns the
+# seconds until the next call, or None once no visualization follows.
+def follow_files():
+    interval = None
+    following = set()
+    for ob in bpy.data.objects:
+        props = ob.import_csv
+        if (not ob.visualization or not props.use_follow or not props.filepath):
+            continue
+        if (not can_follow(props.filepath)):
+            continue
+        following.add(ob.name)
+        interval = min(interval or props.follow_interval, props.follow_interval)
+
+        try:
+            previous = followers.get(ob.name)
+            offset = previous.offset if previous else None
+            follower = get_follower(ob)
+            if (follower is not previous or follower.offset != offset):
+                build_visualization(ob, follower.dataStore or DataStorage())
+        except (OSError, ValueError) as e:
+            print('Could not follow {0}: {1}'.format(props.filepath, e))
+
+    for name in list(followers):
+        if (name not in following):
+            del followers[name]
+    return interval
+
+
+# forgets the datasets of the previous .blend file and
+# restarts following files after a .blend file was loaded.
+@bpy.app.handlers.persistent
+def follow_load_post(dummy):
+    datasets.clear()
+    followers.clear()
+    if (any(ob.import_csv.use_follow for ob in bpy.data.objects)
+            and not bpy.app.timers.is_registered(follow_files)):
+        bpy.app.timers.register(follow_files, persistent=True)
+
+
+# returns the mesh named in the custom property key of ob, or None.
+def get_named_mesh(ob, key):
+    name = ob.get(key)
+    if (not isinstance(name, str)):
+        return None
+    return bpy.data.meshes.get(name)
+
+
+# swap_full_resolution replaces the reduced point clouds of scatter
+# plots with every data point while rendering, see
+# ScatterVisualizer.set_full_resolution. Changing data from render
+# handlers needs the interface locked, which set_full_resolution sets.
+@bpy.app.handlers.persistent
+def swap_full_resolution(scene, depsgraph=None):
+    for ob in scene.objects:
+        full = get_named_mesh(ob, ScatterVisualizer.FULL_KEY)
+        if (full is None or ob.data == full):
+            continue
+        ob[ScatterVisualizer.LOD_KEY] = ob.data.name
+        ob.data = full
+
+
+@bpy.app.handlers.persistent
+def restore_reduced_resolution(scene, depsgraph=None):
+    for ob in scene.objects:
+        if (ScatterVisualizer.LOD_KEY not in ob):
+            continue
+        reduced = get_named_mesh(ob, ScatterVisualizer.LOD_KEY)
+        if (reduced is not None):
+            ob.data = reduced
+        del ob[ScatterVisualizer.LOD_KEY]
+
+
+# CSVImporterPreferences stores the add-on settings
+# which are shared by every visualization.
+class CSVImporterPreferences(AddonPreferences):
+    bl_idname = __name__
+
+    use_cache = BoolProperty(
+            name="Cache Parsed Files",
+            description="Keep parsed files on disk, so unchanged files are not parsed again",
+            default=True,
+            )
+
+    cache_directory = StringProperty(
+            name="Cache Directory",
+            description="Where parsed files are kept (the temporary directory if empty)",
+            subtype='DIR_PATH',
+            default="",
+            )
+
+    cache_size = IntProperty(
+            name="Cache Size (MB)",
+            description="Least recently used files are removed when the cache grows beyond this size",
+            min=1,
+            default=1024,
+            )
+
+    use_parallel = BoolProperty(
+            name="Parallel Parsing",
+            description="Parse large files with one process per core (Linux only)",
+            default=False,
+            )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, 'use_parallel')
+        layout.prop(self, 'use_cache')
+        col = layout.column()
+        col.prop(self, 'cache_directory')
+        col.prop(self, 'cache_size')
+        if (self.use_cache == False):
+            col.enabled = False
+
+
+# returns the add-on preferences, or None when the add-on
+# is not registered as an add-on (e.g. run as a script).
+def get_preferences():
+    addon = bpy.context.preferences.addons.get(__name__)
+    if (addon is None):
+        return None
+    return addon.preferences
+
+
+# returns the DatasetCache configured in the preferences, or None if disabled.
+def get_dataset_cache():
+    prefs = get_preferences()
+    if (prefs is None):
+        return DatasetCache()
+    if (not prefs.use_cache):
+        return None
+    return DatasetCache(bpy.path.abspath(prefs.cache_directory), prefs.cache_size * 1024 * 1024)
+
+
+# returns whether large files are parsed by a pool of processes,
+# which is only done when enabled in the preferences.
+def use_parallel_parsing():
+    prefs = get_preferences()
+    return prefs is not None and prefs.use_parallel
+
+
+# BatchImport builds the visualizations of a manifest without a window,
+# e.g. with blender -b on a render farm:
+#
+#   blender -b template.blend --python __init__.py -- jobs.json --worker 0 --workers 4
+#
+# The manifest is a JSON object with a list of jobs. Each job names a CSV
+# file, a visualizer, options (properties of the import or visualization)
+# and an output, which is rendered to or saved as a .blend file:
+#
+#   {"template": "template.blend",
+#    "jobs": [{"csv": "hosts.csv", "visualizer": "OPT_PIE",
+#              "options": {"column": 1, "aggregate": "MEAN", "value_column": 3},
+#              "output": "renders/hosts.png"}]}
+#
+# Paths are relative to the manifest. Every job starts from the template,
+# which is the open .blend file by default. Jobs reading a file with the
+# same import options share a single parse holding the columns of all
+# of them. Each worker builds the jobs of its share of the files.
+class BatchImport():
+
+    # the visualizer types in the order of ImportCSVProperties.visualizers
+    visualizer_types = ('OPT_SCATTER', 'OPT_PIE', 'OPT_HIST', 'OPT_OBJ')
+    # options which are properties of the import instead of the visualization
+    import_options = ('filter_expression', 'use_streaming', 'chunk_size')
+
+    directory = None
+    template = None
+    jobs = None
+    worker = 0
+    workers = 1
+
+    def __init__(self, manifest_path, worker=0, workers=1):
+        if (not 0 <= worker < workers):
+            raise ValueError('The worker must be between 0 and {0}'.format(workers - 1))
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.directory = os.path.dirname(os.path.abspath(manifest_path))
+        template = manifest.get('template') or bpy.data.filepath
+        if (not template):
+            raise ValueError('A batch import needs a template .blend file')
+        self.template = self.__path(template)
+        self.jobs = manifest.get('jobs', [])
+        self.worker = worker
+        self.workers = workers
+
+    def __path(self, path):
+        return os.path.join(self.directory, os.path.expanduser(path))
+
+    # returns the groups of jobs sharing a parse which this worker builds,
+    # as (filepath, import options, jobs). Groups are assigned the largest
+    # file first to the least loaded worker, which every worker computes alike.
+    def assign(self):
+        groups = {}
+        for job in self.jobs:
+            options = job.get('options', {})
+            key = (self.__path(job['csv']), tuple(options.get(name) for name in self.import_options))
+            groups.setdefault(key, []).append(job)
+
+        def size(filepath):
+            return os.path.getsize(filepath) if os.path.isfile(filepath) else 0
+        keys = sorted(groups, key=lambda key: (-size(key[0]), repr(key)))
+        loads = [0] * self.workers
+        assigned = []
+        for key in keys:
+            worker = loads.index(min(loads))
+            loads[worker] += size(key[0]) or 1
+            if (worker == self.worker):
+                assigned.append((key[0], key[1], groups[key]))
+        return assigned
+
+    # builds the jobs of this worker and returns the amount which failed.
+    def run(self):
+        failed = 0
+        for (filepath, options, jobs) in self.assign():
+            dataStore = None
+            for job in jobs:
+                print('Building {0} from {1}'.format(job.get('output'), filepath))
+                try:
+                    bpy.ops.wm.open_mainfile(filepath=self.template)
+                    if (dataStore is None):
+                        dataStore = self.__read(filepath, jobs)
+                    self.__build(filepath, job, dataStore)
+                except Exception as e:
+                    print('Failed to build {0}: {1}'.format(job.get('output'), e))
+                    failed += 1
+        return failed
+
+    # sets the visualizer and options of a job on a visualization parent.
+    def __apply(self, parent, job):
+        props = parent.import_csv
+        for (name, value) in job.get('options', {}).items():
+            if (name in self.import_options):
+                setattr(props, name, value)
+            elif (name in props.visprops.bl_rna.properties.keys()):
+                setattr(props.visprops, name, value)
+            else:
+                raise ValueError('Unknown option: {0}'.format(name))
+
+        visualizer = job.get('visualizer', 'OPT_SCATTER').upper()
+        if (not visualizer.startswith('OPT_')):
+            visualizer = 'OPT_' + visualizer
+        if (visualizer not in self.visualizer_types):
+            raise ValueError('Unknown visualizer: {0}'.format(job.get('visualizer')))
+        return self.visualizer_types.index(visualizer)
+
+    # parses a file once for a group of jobs, storing the columns every job uses.
+    def __read(self, filepath, jobs):
+        # the columns are found with the properties of an unlinked object,
+        # a new one for each job so that no option carries over to the next
+        projection = set()
+        streaming = False
+        for job in jobs:
+            probe = bpy.data.objects.new('VisualizationEmpty', None)
+            try:
+                props = probe.import_csv
+                props.vis_index = self.__apply(probe, job)
+                projection |= set(get_projection(probe))
+                streaming = streaming or get_streaming(probe)
+                # the jobs of a group share their import options
+                chunk_size, filter_expression = props.chunk_size, props.filter_expression
+            finally:
+                bpy.data.objects.remove(probe)
+
+        reader = CSVReader()
+        if (streaming):
+            return reader.stream_csv(None, filepath, chunk_size, sorted(projection), filter_expression)
+        return reader.parse_csv(None, filepath, get_dataset_cache(), parallel=use_parallel_parsing(),
+                                projection=sorted(projection), filter_expression=filter_expression)
+
+    def __build(self, filepath, job, dataStore):
+        scene = bpy.context.scene
+        parent = bpy.data.objects.new('VisualizationEmpty', None)
+        parent.empty_display_size = 0.25
+        scene.collection.objects.link(parent)
+        parent.visualization = True
+        # the properties of the active object are updated with the type
+        bpy.context.view_layer.objects.active = parent
+
+        props = parent.import_csv
+        index = self.__apply(parent, job)
+        props.type = self.visualizer_types[index]
+        props.vis_index = index
+        props.filepath = filepath
+        build_visualization(parent, dataStore)
+
+        output = self.__path(job['output'])
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        if (output.endswith('.blend')):
+            bpy.ops.wm.save_as_mainfile(filepath=output, copy=True)
+        else:
+            scene.render.filepath = output
+            bpy.ops.render.render(animation=bool(job.get('animation')), write_still=True)
+
+
+# runs a BatchImport with the command line arguments after --.
+def main(argv):
+    parser = argparse.ArgumentParser(prog='blender -b template.blend --python __init__.py --',
+                                     description='Build the visualizations of a manifest.')
+    parser.add_argument('manifest', help='JSON file listing the visualizations to build')
+    parser.add_argument('--worker', type=int, default=0, help='index of this worker, from 0')
+    parser.add_argument('--workers', type=int, default=1, help='amount of workers sharing the manifest')
+    args = parser.parse_args(argv)
+
+    failed = BatchImport(args.manifest, args.worker, args.workers).run()
+    if (failed):
+        sys.exit(1)
+
+
 # AddVisualization is an operator called from the 
 # Add menu in Blender. It creates an empty with a
 # visualization settings available in the data panel.
@@ -1202,6 +4041,19 @@ class VisualizationData(bpy.types.Panel):
         
         box = layout.box()
         box.prop(props, 'type')
+        box.prop(props, 'filter_expression')
+        row = box.row(align=True)
+        row.prop(props, 'use_streaming')
+        col = row.column(align=True)
+        col.prop(props, 'chunk_size')
+        if (props.use_streaming == False):
+            col.enabled = False
+        row = box.row(align=True)
+        row.prop(props, 'use_follow')
+        col = row.column(align=True)
+        col.prop(props, 'follow_interval')
+        if (props.use_follow == False):
+            col.enabled = False
         if (props.visualizers):
             props.visualizers[props.vis_index].draw(layout, context, props.visprops)
         
@@ -1214,6 +4066,7 @@ def menu_func_import(self, context):
     self.layout.operator(ImportCSV.bl_idname, text="Statistical Data (.csv)")
 
 classes = (
+    CSVImporterPreferences,
     VisualizationProperties,
     ImportCSVProperties,
     ImportCSV,
@@ -1232,8 +4085,21 @@ def register():
         description="Determines whether object is parent to a visualization",
         default=False,
         )
+    bpy.app.handlers.load_post.append(follow_load_post)
+    bpy.app.handlers.render_pre.append(swap_full_resolution)
+    bpy.app.handlers.render_post.append(restore_reduced_resolution)
+    bpy.app.handlers.render_cancel.append(restore_reduced_resolution)
 
 def unregister():
+    if (bpy.app.timers.is_registered(follow_files)):
+        bpy.app.timers.unregister(follow_files)
+    if (follow_load_post in bpy.app.handlers.load_post):
+        bpy.app.handlers.load_post.remove(follow_load_post)
+    for (handlers, handler) in ((bpy.app.handlers.render_pre, swap_full_resolution),
+                                (bpy.app.handlers.render_post, restore_reduced_resolution),
+                                (bpy.app.handlers.render_cancel, restore_reduced_resolution)):
+        if (handler in handlers):
+            handlers.remove(handler)
     for cls in classes:
         bpy.utils.unregister_class(cls)
 
@@ -1245,4 +4111,7 @@ def unregister():
 
 if __name__ == "__main__":
     register()
+    # arguments after -- are the batch import, see BatchImport
+    if ('--' in sys.argv):
+        main(sys.argv[sys.argv.index('--') + 1:])
 